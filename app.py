@@ -1,62 +1,147 @@
+import threading
+import time
 import streamlit as st
 import pandas as pd
 import numpy as np
 from integrated_farm_recommendations import (
-    predict_yield, get_crop_recommendation, get_fertilizer_recommendation,
-    get_pesticide_recommendation, get_water_management_recommendation,
-    assess_weather_impact, assess_water_quality,
+    generate_recommendations,
     irrigation_efficiency,
     crop_water_requirements,
     weather_impact,
     water_quality_parameters,
-    initialize_models,
-    calculate_water_usage,
-    calculate_rotation_score,
-    calculate_fertilizer_usage,
-    calculate_pesticide_usage
+    load_or_train_models,
+    model_version
 )
+from yield_explanations import top_drivers
+from drift_monitor import DriftMonitor, psi_warning, psi_drift
+from recommendation_history import (
+    HistoryWriter, open_history,
+    history_summary, history_daily, recent_history
+)
+from shadow_evaluation import load_shadow_evaluator, SUMMARY_PATH
+from partial_dependence import load_or_compute_partial_dependence
 import plotly.express as px
 import plotly.graph_objects as go
 
-def initialize_models():
+def initialize_models(on_progress=None):
     """Initialize all required models"""
-    try:
-        from integrated_farm_recommendations import train_yield_prediction_model
-        yield_model, yield_le, yield_scaler = train_yield_prediction_model()
-        
-        if yield_model is None or yield_le is None or yield_scaler is None:
-            st.error("Failed to initialize one or more models")
-            return None
-            
-        return {
-            'yield_model': yield_model,
-            'yield_le': yield_le,
-            'yield_scaler': yield_scaler
-        }
-    except Exception as e:
-        st.error(f"Error initializing models: {str(e)}")
-        return None
+    models = load_or_train_models(on_progress=on_progress)
+    return {
+        'yield_model': models['yield_model'],
+        'yield_le_dict': models['yield_le_dict'],
+        'yield_scaler': models['yield_scaler']
+    }
+
+@st.cache_resource
+def start_model_warmup():
+    """Load or train the models on a background thread, once per server.
+
+    Returns a dict that the thread fills in: 'progress', 'message' and,
+    when finished, 'models' or 'error'. Streamlit calls are not allowed
+    from the thread, so it only writes to this dict.
+    """
+    state = {'progress': 0.0, 'message': "Starting", 'models': None, 'error': None}
+
+    def report(fraction, message):
+        state['progress'] = fraction
+        state['message'] = message
+
+    def warm_up():
+        try:
+            state['models'] = initialize_models(on_progress=report)
+        except Exception as e:
+            state['error'] = str(e)
+
+    threading.Thread(target=warm_up, name="model-warmup", daemon=True).start()
+    return state
+
+@st.cache_resource
+def get_drift_monitor():
+    """Input drift monitor shared by all sessions of this server"""
+    return DriftMonitor()
+
+@st.cache_resource
+def get_history_writer():
+    """Background writer for the recommendation history, shared by all sessions"""
+    return HistoryWriter()
+
+@st.cache_resource
+def get_shadow_evaluator():
+    """Shadow scorer for candidate_models.joblib, or None when there is no candidate"""
+    return load_shadow_evaluator(summary_path=SUMMARY_PATH)
+
+@st.cache_resource
+def start_partial_dependence(_models, version, n_samples):
+    """Load or compute partial dependence curves on a background thread.
+
+    Once per model version and sample size. Returns a dict that the thread
+    fills in with 'curves' or 'error', like start_model_warmup().
+    """
+    state = {'curves': None, 'error': None}
+
+    def compute():
+        try:
+            state['curves'] = load_or_compute_partial_dependence(_models, n_samples=n_samples)
+        except Exception as e:
+            state['error'] = str(e)
+
+    threading.Thread(target=compute, name="partial-dependence", daemon=True).start()
+    return state
+
+def show_yield_response(pdp, feature):
+    """Yield response panel for a start_partial_dependence() state"""
+    if pdp['error'] is not None:
+        st.error(f"Error computing yield response curves: {pdp['error']}")
+        if st.button("Retry yield response"):
+            start_partial_dependence.clear()
+            st.rerun()
+    elif pdp['curves'] is None:
+        st.info("Computing yield response curves in the background...")
+    else:
+        curve = pdp['curves'][feature]
+        fig = go.Figure()
+        for ice in curve['ice']:
+            fig.add_trace(go.Scatter(x=curve['grid'], y=ice, mode='lines', showlegend=False,
+                                     line={'color': 'lightgray', 'width': 1}, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=curve['grid'], y=curve['average'], mode='lines',
+                                 name="Average (partial dependence)",
+                                 line={'color': 'green', 'width': 3}))
+        fig.update_layout(title=f"Predicted yield per acre vs {feature}",
+                          xaxis_title=feature,
+                          yaxis_title="tons per acre (before weather)")
+        st.plotly_chart(fig)
+
+@st.fragment(run_every=1)
+def poll_yield_response(pdp, feature):
+    """show_yield_response() that refreshes itself while the curves compute.
+
+    Only this fragment reruns, so the rest of the page, including results
+    of a Generate click, is left alone.
+    """
+    show_yield_response(pdp, feature)
 
 def main():
     st.set_page_config(page_title="Sustainable Farming Advisor", layout="wide")
     
     st.title("🌾 Sustainable Farming Recommendation System")
     
-    tabs = st.tabs(["Farm Input", "Recommendations", "Analytics"])
-    
-    # Initialize models at startup
-    if 'models' not in st.session_state:
-        models = initialize_models()
-        if models is not None:
-            st.session_state.models = models
-        else:
-            st.error("Failed to initialize models. Please check your data and model setup.")
-            return  # Exit if models aren't properly initialized
-    
-    # Check if models are properly initialized before proceeding
-    if st.session_state.models is None:
-        st.error("Models not properly initialized. Please refresh the page or check the setup.")
+    # Models load in the background; the form renders while they do
+    warmup = start_model_warmup()
+    if warmup['error'] is not None:
+        st.error(f"Error initializing models: {warmup['error']}")
+        st.error("Failed to initialize models. Please check your data and model setup.")
+        # The failed state is cached for the whole server; drop it so a retry starts over
+        if st.button("Retry loading models"):
+            start_model_warmup.clear()
+            st.rerun()
         return
+    if warmup['models'] is not None:
+        st.session_state.models = warmup['models']
+    models_ready = 'models' in st.session_state
+    if not models_ready:
+        st.progress(warmup['progress'], text=f"{warmup['message']}...")
+    
+    tabs = st.tabs(["Farm Input", "Recommendations", "Analytics"])
         
     with tabs[0]:
         st.header("Farm Information")
@@ -130,187 +215,277 @@ def main():
             ["Chemical", "Organic", "Mixed"]
         )
     
-    if st.button("Generate Recommendations"):
+    if not models_ready:
         with tabs[1]:
-            st.header("Farm Recommendations")
-            
-            # 1. Crop Rotation
-            with st.expander("🌱 Crop Rotation", expanded=True):
-                next_crop = get_crop_recommendation(current_crop, 
-                                                  [prev_crop1, prev_crop2, prev_crop3],
-                                                  season, soil_type)
-                unique_crops = len(set([current_crop, prev_crop1, prev_crop2, prev_crop3]))
-                rotation_score = (unique_crops / 4) * 100
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown(f"**Recommended next crop:** {next_crop}")
-                    st.markdown(f"**Rotation Diversity Score:** {rotation_score:.1f}%")
-                    st.progress(rotation_score/100)
-                
-                with col2:
-                    # Crop rotation visualization
-                    fig = go.Figure(data=[go.Pie(labels=[current_crop, prev_crop1, prev_crop2, prev_crop3],
-                                                hole=.3,
-                                                title="Crop History")])
-                    st.plotly_chart(fig)
-            
-            # 2. Fertilizer Recommendations
-            with st.expander("🌿 Fertilizer Management", expanded=True):
-                fertilizer_recs = get_fertilizer_recommendation(
-                    soil_type, current_crop, organic_matter, soil_ph,
-                    ", ".join(fertilizer_type), fertilizer_category
-                )
-                
-                # Display recommendations in a clean format
-                for rec in fertilizer_recs:
-                    if rec.startswith('\n'):
-                        st.markdown("---")
-                    st.markdown(rec)
-                
-                # Add soil health visualization
-                col1, col2 = st.columns(2)
-                with col1:
-                    fig = go.Figure(go.Indicator(
-                        mode="gauge+number",
-                        value=soil_ph,
-                        title={'text': "Soil pH"},
-                        gauge={'axis': {'range': [0, 14]},
-                               'bar': {'color': "darkblue"},
-                               'steps': [
-                                   {'range': [0, 5.5], 'color': "red"},
-                                   {'range': [5.5, 7.5], 'color': "green"},
-                                   {'range': [7.5, 14], 'color': "red"}]}))
-                    st.plotly_chart(fig)
-                with col2:
-                    fig = go.Figure(go.Indicator(
-                        mode="gauge+number",
-                        value=organic_matter,
-                        title={'text': "Organic Matter (%)"},
-                        gauge={'axis': {'range': [0, 30]}}))
-                    st.plotly_chart(fig)
-            
-            # 3. Pesticide Recommendations
-            with st.expander("🐛 Pest Management", expanded=True):
-                pesticide_recs = get_pesticide_recommendation(
-                    current_pesticide, pesticide_category, current_crop, season
-                )
+            st.info("Models are still loading. Recommendations will unlock automatically.")
+    
+    if st.button("Generate Recommendations", disabled=not models_ready):
+        started = time.perf_counter()
+        record = {
+            'current_crop': current_crop,
+            'prev_crop1': prev_crop1,
+            'prev_crop2': prev_crop2,
+            'prev_crop3': prev_crop3,
+            'soil_type': soil_type,
+            'season': season,
+            'organic_matter': organic_matter,
+            'soil_ph': soil_ph,
+            'fertilizer_category': fertilizer_category,
+            'pesticide_category': pesticide_category,
+            'irrigation_type': irrigation_type,
+            'farm_area': farm_area,
+            'current_fertilizer': ", ".join(fertilizer_type),
+            'current_pesticide': current_pesticide,
+            'temperature': temperature,
+            'rainfall_level': rainfall_level,
+            'water_ph': water_ph,
+            'salinity_level': salinity_level
+        }
+        # Track how far live inputs sit from the training data
+        get_drift_monitor().update([record])
+        
+        try:
+            bundle = generate_recommendations(record, st.session_state.models, explain=True)
+        except Exception as e:
+            bundle = None
+            with tabs[1]:
+                st.error(f"Error generating recommendations: {str(e)}")
+                st.error("Please check your input data and model setup.")
+        
+        if bundle is not None:
+            with tabs[1]:
+                st.header("Farm Recommendations")
                 
-                for rec in pesticide_recs:
-                    if rec.startswith('\n'):
-                        st.markdown("---")
-                    st.markdown(rec)
-            
-            # 4. Water Management
-            with st.expander("💧 Water Management", expanded=True):
-                water_recs = get_water_management_recommendation(
-                    current_crop, season, soil_type, irrigation_type, farm_area
-                )
+                # 1. Crop Rotation
+                with st.expander("🌱 Crop Rotation", expanded=True):
+                    next_crop = bundle['crop_rotation']['next_crop']
+                    rotation_score = bundle['crop_rotation']['rotation_score']
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown(f"**Recommended next crop:** {next_crop}")
+                        st.markdown(f"**Rotation Diversity Score:** {rotation_score:.1f}%")
+                        st.progress(rotation_score/100)
+                    
+                    with col2:
+                        # Crop rotation visualization
+                        fig = go.Figure(data=[go.Pie(labels=[current_crop, prev_crop1, prev_crop2, prev_crop3],
+                                                    hole=.3,
+                                                    title="Crop History")])
+                        st.plotly_chart(fig)
                 
-                for rec in water_recs:
-                    if rec.startswith('\n'):
-                        st.markdown("---")
-                    st.markdown(rec)
+                # 2. Fertilizer Recommendations
+                with st.expander("🌿 Fertilizer Management", expanded=True):
+                    fertilizer_recs = bundle['fertilizer']
+                    
+                    # Display recommendations in a clean format
+                    for rec in fertilizer_recs:
+                        if rec.startswith('\n'):
+                            st.markdown("---")
+                        st.markdown(rec)
+                    
+                    # Add soil health visualization
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        fig = go.Figure(go.Indicator(
+                            mode="gauge+number",
+                            value=soil_ph,
+                            title={'text': "Soil pH"},
+                            gauge={'axis': {'range': [0, 14]},
+                                   'bar': {'color': "darkblue"},
+                                   'steps': [
+                                       {'range': [0, 5.5], 'color': "red"},
+                                       {'range': [5.5, 7.5], 'color': "green"},
+                                       {'range': [7.5, 14], 'color': "red"}]}))
+                        st.plotly_chart(fig)
+                    with col2:
+                        fig = go.Figure(go.Indicator(
+                            mode="gauge+number",
+                            value=organic_matter,
+                            title={'text': "Organic Matter (%)"},
+                            gauge={'axis': {'range': [0, 30]}}))
+                        st.plotly_chart(fig)
                 
-                # Water efficiency visualization
-                col1, col2 = st.columns(2)
-                with col1:
-                    efficiency = irrigation_efficiency.get(irrigation_type, 0.5) * 100
-                    fig = go.Figure(go.Indicator(
-                        mode="gauge+number",
-                        value=efficiency,
-                        title={'text': "Irrigation Efficiency (%)"},
-                        gauge={'axis': {'range': [0, 100]}}))
-                    st.plotly_chart(fig)
+                # 3. Pesticide Recommendations
+                with st.expander("🐛 Pest Management", expanded=True):
+                    pesticide_recs = bundle['pesticide']
+                    
+                    for rec in pesticide_recs:
+                        if rec.startswith('\n'):
+                            st.markdown("---")
+                        st.markdown(rec)
                 
-                with col2:
-                    if current_crop in crop_water_requirements and season in crop_water_requirements[current_crop]:
-                        water_needed = crop_water_requirements[current_crop][season]
+                # 4. Water Management
+                with st.expander("💧 Water Management", expanded=True):
+                    water_recs = bundle['water_management']
+                    
+                    for rec in water_recs:
+                        if rec.startswith('\n'):
+                            st.markdown("---")
+                        st.markdown(rec)
+                    
+                    # Water efficiency visualization
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        efficiency = irrigation_efficiency.get(irrigation_type, 0.5) * 100
                         fig = go.Figure(go.Indicator(
-                            mode="number+delta",
-                            value=water_needed,
-                            title={'text': "Water Requirement (mm/acre)"}))
+                            mode="gauge+number",
+                            value=efficiency,
+                            title={'text': "Irrigation Efficiency (%)"},
+                            gauge={'axis': {'range': [0, 100]}}))
                         st.plotly_chart(fig)
-            
-            # 5. Yield Prediction
-            with st.expander("📊 Yield Prediction", expanded=True):
-                try:
-                    # Calculate required values first
-                    water_usage = calculate_water_usage(farm_area, irrigation_type)
-                    rotation_score = calculate_rotation_score(current_crop, prev_crop1, prev_crop2, prev_crop3)
-                    fertilizer_usage = calculate_fertilizer_usage(farm_area, fertilizer_category)
-                    pesticide_usage = calculate_pesticide_usage(farm_area, pesticide_category)
                     
-                    yield_prediction = predict_yield(
-                        current_crop=current_crop,
-                        soil_type=soil_type,
-                        season=season,
-                        organic_matter=organic_matter,
-                        soil_ph=soil_ph,
-                        fertilizer_category=fertilizer_category,
-                        irrigation_type=irrigation_type,
-                        farm_area=farm_area,
-                        water_usage=water_usage,
-                        rotation_score=rotation_score,
-                        fertilizer_usage=fertilizer_usage,
-                        pesticide_usage=pesticide_usage,
-                        temperature=temperature,
-                        rainfall_level=rainfall_level,
-                        model=st.session_state.models['yield_model'],
-                        le_dict=st.session_state.models['yield_le'],
-                        scaler=st.session_state.models['yield_scaler']
-                    )
-                    
-                    # Display predictions only if successful
-                    if yield_prediction:
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.markdown(f"**Estimated yield per acre:** {yield_prediction['per_acre']} tons")
-                            st.markdown(f"**Total estimated yield:** {yield_prediction['total']} tons")
-                            st.markdown(f"**Weather impact factor:** {yield_prediction['weather_impact']}")
-                        
-                        with col2:
-                            # Yield prediction visualization
+                    with col2:
+                        if current_crop in crop_water_requirements and season in crop_water_requirements[current_crop]:
+                            water_needed = crop_water_requirements[current_crop][season]
                             fig = go.Figure(go.Indicator(
-                                mode="gauge+number",
-                                value=yield_prediction['per_acre'],
-                                title={'text': "Yield per Acre (tons)"},
-                                gauge={'axis': {'range': [0, 150]},
-                                       'bar': {'color': "green"},
-                                       'steps': [
-                                           {'range': [0, 50], 'color': "lightgray"},
-                                           {'range': [50, 100], 'color': "lightgreen"},
-                                           {'range': [100, 150], 'color': "darkgreen"}]}
-                            ))
+                                mode="number+delta",
+                                value=water_needed,
+                                title={'text': "Water Requirement (mm/acre)"}))
                             st.plotly_chart(fig)
+                
+                # 5. Yield Prediction
+                with st.expander("📊 Yield Prediction", expanded=True):
+                    yield_prediction = bundle['yield']
+                    shadow = get_shadow_evaluator()
+                    if shadow is not None:
+                        shadow.submit(record, yield_prediction['per_acre'], yield_prediction['weather_impact'])
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown(f"**Estimated yield per acre:** {yield_prediction['per_acre']} tons")
+                        st.markdown(f"**Total estimated yield:** {yield_prediction['total']} tons")
+                        st.markdown(f"**Weather impact factor:** {yield_prediction['weather_impact']}")
 
-                            # Weather impact visualization
-                            fig = go.Figure(go.Indicator(
-                                mode="gauge+number",
-                                value=yield_prediction['weather_impact'] * 100,
-                                title={'text': "Weather Impact (%)"},
-                                gauge={'axis': {'range': [0, 100]},
-                                       'bar': {'color': "blue"},
-                                       'steps': [
-                                           {'range': [0, 33], 'color': "red"},
-                                           {'range': [33, 66], 'color': "yellow"},
-                                           {'range': [66, 100], 'color': "green"}]}
-                            ))
-                            st.plotly_chart(fig)
-                    
-                except Exception as e:
-                    st.error(f"Error in yield prediction: {str(e)}")
-                    st.error("Please check your input data and model setup.")
+                        # Top drivers of this prediction
+                        st.markdown("**Top yield drivers:**")
+                        drivers = top_drivers(yield_prediction['contributions'])
+                        fig = go.Figure(go.Bar(
+                            x=[value for _, value in drivers][::-1],
+                            y=[feature for feature, _ in drivers][::-1],
+                            orientation='h',
+                            marker_color=['green' if value >= 0 else 'red' for _, value in drivers][::-1]
+                        ))
+                        fig.update_layout(
+                            title=f"Contribution to yield per acre (baseline {yield_prediction['baseline']} tons)",
+                            xaxis_title="tons per acre",
+                            height=300
+                        )
+                        st.plotly_chart(fig)
+
+                    with col2:
+                        # Yield prediction visualization
+                        fig = go.Figure(go.Indicator(
+                            mode="gauge+number",
+                            value=yield_prediction['per_acre'],
+                            title={'text': "Yield per Acre (tons)"},
+                            gauge={'axis': {'range': [0, 150]},
+                                   'bar': {'color': "green"},
+                                   'steps': [
+                                       {'range': [0, 50], 'color': "lightgray"},
+                                       {'range': [50, 100], 'color': "lightgreen"},
+                                       {'range': [100, 150], 'color': "darkgreen"}]}
+                        ))
+                        st.plotly_chart(fig)
+
+                        # Weather impact visualization
+                        fig = go.Figure(go.Indicator(
+                            mode="gauge+number",
+                            value=yield_prediction['weather_impact'] * 100,
+                            title={'text': "Weather Impact (%)"},
+                            gauge={'axis': {'range': [0, 100]},
+                                   'bar': {'color': "blue"},
+                                   'steps': [
+                                       {'range': [0, 33], 'color': "red"},
+                                       {'range': [33, 66], 'color': "yellow"},
+                                       {'range': [66, 100], 'color': "green"}]}
+                        ))
+                        st.plotly_chart(fig)
+                
+                # Additional Sustainable Practices
+                with st.expander("🌍 Sustainable Practices", expanded=True):
+                    st.markdown("""
+                    1. Use crop residue as organic matter
+                    2. Implement mulching
+                    3. Consider companion planting
+                    4. Regular soil testing every 6 months
+                    5. Maintain field borders for beneficial insects
+                    """)
+                
+            # Logged off the request path by the background history writer
+            get_history_writer().record(record, bundle, (time.perf_counter() - started) * 1000,
+                                        'app', model_version(st.session_state.models))
+    
+    with tabs[2]:
+        st.header("Input Drift")
+        monitor = get_drift_monitor()
+        drift = monitor.snapshot_frame()
+        if drift.empty:
+            st.info("No recommendations generated yet.")
+        else:
+            st.markdown(f"**Inputs monitored:** {monitor.count}")
+            st.markdown("Population Stability Index against the training data "
+                        f"(warning ≥ {psi_warning}, drift ≥ {psi_drift})")
+            fig = px.bar(drift, x='psi', y='feature', color='status', orientation='h',
+                         color_discrete_map={'ok': 'green', 'warning': 'orange', 'drift': 'red'})
+            st.plotly_chart(fig)
             
-            # Additional Sustainable Practices
-            with st.expander("🌍 Sustainable Practices", expanded=True):
-                st.markdown("""
-                1. Use crop residue as organic matter
-                2. Implement mulching
-                3. Consider companion planting
-                4. Regular soil testing every 6 months
-                5. Maintain field borders for beneficial insects
-                """)
+            numerical = drift[drift['type'] == 'numerical']
+            st.dataframe(numerical[['feature', 'mean', 'training_mean', 'min', 'max',
+                                    'out_of_range', 'psi', 'ks', 'status']])
+            categorical = drift[drift['type'] == 'categorical']
+            st.dataframe(categorical[['feature', 'unseen_categories', 'psi', 'status']])
+        
+        st.header("Recommendation History")
+        history_days = st.slider("Days of history", 1, 365, 30)
+        history_crop = st.selectbox("Crop filter", ["All", "Rice", "Wheat", "Cotton", "Maize",
+                                                   "Sugarcane", "Potato", "Soybean"])
+        crop_filter = None if history_crop == "All" else history_crop
+        since = time.time() - history_days * 86400
+        conn = open_history()
+        try:
+            summary = history_summary(conn, since=since, crop=crop_filter)
+            daily = history_daily(conn, since=since, crop=crop_filter)
+            recent = recent_history(conn, limit=50, crop=crop_filter)
+        finally:
+            conn.close()
+        if summary.empty:
+            st.info("No recommendations recorded in this period.")
+        else:
+            st.markdown(f"**Recommendations issued:** {int(summary['recommendations'].sum())}")
+            fig = px.line(daily, x='day', y='recommendations', title="Recommendations per day")
+            st.plotly_chart(fig)
+            st.dataframe(summary)
+            st.subheader("Most recent")
+            st.dataframe(recent)
+        
+        if models_ready:
+            st.header("Yield Response")
+            pdp_feature = st.selectbox("Input", [
+                'Soil_pH', 'Organic_Matter_Content(%)', 'Water_Usage(cubic meters)',
+                'Rotation_Health_Score', 'Fertilizer_Used(tons)', 'Pesticide_Used(kg)'
+            ])
+            pdp_samples = st.select_slider("Farms averaged", [500, 1000, 2000, 4500], value=2000)
+            models = st.session_state.models
+            pdp = start_partial_dependence(models, model_version(models), pdp_samples)
+            if pdp['curves'] is None and pdp['error'] is None:
+                poll_yield_response(pdp, pdp_feature)
+            else:
+                show_yield_response(pdp, pdp_feature)
+        
+        shadow = get_shadow_evaluator()
+        if shadow is not None:
+            st.header("Candidate Model (Shadow Mode)")
+            summary = shadow.snapshot()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Farms scored", summary['scored'])
+            col2.metric("Mean |delta| (tons/acre)", summary.get('mean_abs_delta', '-'))
+            col3.metric("Candidate ms per farm (p50)", summary.get('candidate_ms_per_farm_p50', '-'))
+            st.json(summary)
+    
+    # Poll the warm-up thread so the page unlocks itself once models are ready
+    if not models_ready:
+        time.sleep(1)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
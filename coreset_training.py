@@ -0,0 +1,89 @@
+import argparse
+import contextlib
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from dataset import generate_sustainable_farming_dataset
+from integrated_farm_recommendations import (
+    encode_yield_features,
+    stratified_coreset,
+    train_yield_prediction_model,
+    train_crop_recommendation_model
+)
+from shared_model import memory_usage
+
+DATA_PATH = 'sustainable_farming_dataset.csv'
+
+# Set in the parent right before forking a trainer, so the data is not pickled
+_train_data = None
+_test_data = None
+
+def _train_and_score(kind, coreset):
+    """Fit one model in a fresh process; report time, peak memory growth and holdout scores"""
+    rss_start = memory_usage().get('rss_mb', 0.0)
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if kind == 'yield':
+            model, le_dict, scaler = train_yield_prediction_model(coreset=coreset, data=_train_data)
+        else:
+            train_crop_recommendation_model(coreset=coreset, data=_train_data)
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    scores = {}
+    if kind == 'yield':
+        predicted = model.predict(encode_yield_features(_test_data, le_dict, scaler))
+        actual = _test_data['Yield(tons)'].to_numpy()
+        scores = {'r2': r2_score(actual, predicted),
+                  'rmse': float(np.sqrt(mean_squared_error(actual, predicted)))}
+    return {'seconds': seconds, 'peak_mb': max(peak_mb - rss_start, 0.0), **scores}
+
+def compare_coreset_training(data, coreset=True, test_size=0.2, random_state=42):
+    """Train both forests on all training rows and on a coreset, scored on the same holdout.
+
+    Every fit runs in its own forked process so its peak memory is measured
+    in isolation. Returns one row per model and mode. The crop model is
+    compared on cost only: its target, Current_Crop, is also one of its
+    features, so any holdout accuracy would be trivially perfect.
+    """
+    global _train_data, _test_data
+    _train_data, _test_data = train_test_split(data, test_size=test_size, random_state=random_state)
+    coreset_rows = len(stratified_coreset(_train_data, None if coreset is True else coreset))
+
+    results = []
+    context = multiprocessing.get_context('fork')
+    for kind in ('yield', 'crop'):
+        for mode, option in (('full', None), ('coreset', coreset)):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(_train_and_score, kind, option).result()
+            rows = len(_train_data) if option is None else coreset_rows
+            results.append({'model': kind, 'mode': mode, 'rows': rows, **result})
+    return pd.DataFrame(results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare full-data and coreset training of the forests")
+    parser.add_argument('--rows', type=int, default=0,
+                        help="generate a synthetic dataset of this many rows instead of reading the CSV")
+    parser.add_argument('--size', type=int, default=None, help="coreset size (default: automatic)")
+    args = parser.parse_args()
+
+    if args.rows:
+        np.random.seed(0)
+        data = generate_sustainable_farming_dataset(args.rows)
+    else:
+        data = pd.read_csv(DATA_PATH)
+    results = compare_coreset_training(data, args.size or True)
+    print(results.round(3).to_string(index=False))
+    print("crop: no accuracy reported, Current_Crop is both its target and a feature")
+
+    for kind, group in results.groupby('model', sort=False):
+        full, sub = group.set_index('mode').loc['full'], group.set_index('mode').loc['coreset']
+        print(f"{kind}: {full['seconds'] / max(sub['seconds'], 1e-9):.1f}x faster, "
+              f"{full['peak_mb'] / max(sub['peak_mb'], 1e-9):.1f}x less peak memory on "
+              f"{sub['rows'] / full['rows']:.1%} of the rows")
@@ -174,15 +174,16 @@ def generate_sustainable_farming_dataset(n_samples=4500):
     
     return df
 
-# Generate dataset
-sustainable_farming_df = generate_sustainable_farming_dataset()
-
-# Save to CSV
-sustainable_farming_df.to_csv('sustainable_farming_dataset.csv', index=False)
-
-# Display sample and basic statistics
-print("Dataset Shape:", sustainable_farming_df.shape)
-print("\nSample of the dataset:")
-print(sustainable_farming_df.head())
-print("\nBasic Statistics:")
-print(sustainable_farming_df.describe())
+if __name__ == "__main__":
+    # Generate dataset
+    sustainable_farming_df = generate_sustainable_farming_dataset()
+
+    # Save to CSV
+    sustainable_farming_df.to_csv('sustainable_farming_dataset.csv', index=False)
+
+    # Display sample and basic statistics
+    print("Dataset Shape:", sustainable_farming_df.shape)
+    print("\nSample of the dataset:")
+    print(sustainable_farming_df.head())
+    print("\nBasic Statistics:")
+    print(sustainable_farming_df.describe())
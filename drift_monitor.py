@@ -0,0 +1,173 @@
+import threading
+import pandas as pd
+import numpy as np
+from integrated_farm_recommendations import (
+    yield_categorical_features,
+    yield_numerical_features,
+    build_yield_features,
+    farm_records_from_dataset
+)
+
+DATA_PATH = 'sustainable_farming_dataset.csv'
+
+monitored_numerical = yield_numerical_features + ['Farm_Area(acres)']
+monitored_categorical = yield_categorical_features + ['Pesticide_Category']
+
+# PSI thresholds commonly used for "watch" and "act"
+psi_warning = 0.1
+psi_drift = 0.25
+
+def build_training_profile(data_path=DATA_PATH, n_bins=10):
+    """Bin edges and reference distributions for every monitored feature.
+
+    Numeric features get quantile bins over the training data plus one
+    overflow bin on each side, so out-of-range inputs are counted apart.
+    The dataset goes through the same feature derivation as live records,
+    so water, fertilizer, pesticide and rotation values are the estimates
+    served to the model rather than the amounts recorded in the CSV.
+    """
+    data = monitored_features(farm_records_from_dataset(pd.read_csv(data_path)))
+    profile = {'numerical': {}, 'categorical': {}}
+    for col in monitored_numerical:
+        values = data[col].to_numpy(dtype=float)
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)))
+        counts = np.bincount(_bin_index(values, edges), minlength=len(edges) + 1)
+        profile['numerical'][col] = {
+            'edges': edges,
+            'reference': counts / counts.sum(),
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'mean': float(values.mean()),
+            'std': float(values.std())
+        }
+    for col in monitored_categorical:
+        frequencies = data[col].value_counts(normalize=True)
+        profile['categorical'][col] = frequencies.to_dict()
+    return profile
+
+def monitored_features(farms):
+    """The monitored columns for a DataFrame of farm records"""
+    features = build_yield_features(farms)
+    features['Farm_Area(acres)'] = farms['farm_area'].astype(float).to_numpy()
+    features['Pesticide_Category'] = farms['pesticide_category'].to_numpy()
+    return features
+
+def _bin_index(values, edges):
+    # 0 = below the training minimum, len(edges) = above the training maximum
+    index = np.searchsorted(edges, values, side='right')
+    index[values == edges[-1]] = len(edges) - 1
+    return index
+
+def population_stability_index(reference, observed, epsilon=1e-4):
+    """PSI between two binned distributions given as probabilities"""
+    reference = np.clip(reference, epsilon, None)
+    observed = np.clip(observed, epsilon, None)
+    return float(np.sum((observed - reference) * np.log(observed / reference)))
+
+def binned_ks(reference, observed):
+    """Kolmogorov-Smirnov statistic evaluated at the bin edges"""
+    return float(np.max(np.abs(np.cumsum(reference) - np.cumsum(observed))))
+
+class DriftMonitor:
+    """Streaming comparison of incoming farm inputs with the training data.
+
+    Memory is fixed by the number of features and bins: each numeric
+    feature keeps bin counts and running moments, each categorical
+    feature keeps one counter per category seen.
+    """
+
+    def __init__(self, profile=None):
+        self.profile = profile or build_training_profile()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.numerical = {
+                col: {
+                    'counts': np.zeros(len(spec['edges']) + 1, dtype=np.int64),
+                    'mean': 0.0,
+                    'm2': 0.0,
+                    'min': np.inf,
+                    'max': -np.inf
+                }
+                for col, spec in self.profile['numerical'].items()
+            }
+            self.categorical = {col: {} for col in self.profile['categorical']}
+
+    def update(self, farms):
+        """Add a DataFrame (or list of dicts) of farm records to the statistics"""
+        features = monitored_features(pd.DataFrame(farms))
+        n = len(features)
+
+        with self._lock:
+            self.count += n
+            for col, spec in self.profile['numerical'].items():
+                values = features[col].to_numpy(dtype=float)
+                state = self.numerical[col]
+                state['counts'] += np.bincount(_bin_index(values, spec['edges']),
+                                               minlength=len(state['counts']))
+                # Chan et al. parallel update of the running mean and variance
+                seen = self.count - n
+                batch_mean = values.mean()
+                delta = batch_mean - state['mean']
+                state['mean'] += delta * n / self.count
+                state['m2'] += ((values - batch_mean) ** 2).sum() + delta ** 2 * seen * n / self.count
+                state['min'] = min(state['min'], float(values.min()))
+                state['max'] = max(state['max'], float(values.max()))
+            for col in self.profile['categorical']:
+                counts = self.categorical[col]
+                for category, value in features[col].value_counts().items():
+                    counts[category] = counts.get(category, 0) + int(value)
+
+    def snapshot(self):
+        """Current drift statistics, one entry per monitored feature"""
+        with self._lock:
+            result = {'count': self.count, 'numerical': {}, 'categorical': {}}
+            if self.count == 0:
+                return result
+            for col, spec in self.profile['numerical'].items():
+                state = self.numerical[col]
+                observed = state['counts'] / self.count
+                psi = population_stability_index(spec['reference'], observed)
+                result['numerical'][col] = {
+                    'mean': state['mean'],
+                    'std': float(np.sqrt(state['m2'] / self.count)),
+                    'min': state['min'],
+                    'max': state['max'],
+                    'training_mean': spec['mean'],
+                    'training_range': (spec['min'], spec['max']),
+                    'out_of_range': float(observed[0] + observed[-1]),
+                    'psi': psi,
+                    'ks': binned_ks(spec['reference'], observed),
+                    'status': _status(psi)
+                }
+            for col, reference in self.profile['categorical'].items():
+                counts = self.categorical[col]
+                categories = sorted(set(reference) | set(counts))
+                ref = np.array([reference.get(c, 0.0) for c in categories])
+                observed = np.array([counts.get(c, 0) for c in categories]) / self.count
+                psi = population_stability_index(ref, observed)
+                result['categorical'][col] = {
+                    'unseen_categories': sorted(set(counts) - set(reference)),
+                    'psi': psi,
+                    'status': _status(psi)
+                }
+            return result
+
+    def snapshot_frame(self):
+        """Flatten snapshot() into one row per feature, for display"""
+        snapshot = self.snapshot()
+        rows = [{'feature': col, 'type': 'numerical', **stats}
+                for col, stats in snapshot['numerical'].items()]
+        rows += [{'feature': col, 'type': 'categorical', **stats}
+                 for col, stats in snapshot['categorical'].items()]
+        return pd.DataFrame(rows)
+
+def _status(psi):
+    if psi >= psi_drift:
+        return 'drift'
+    if psi >= psi_warning:
+        return 'warning'
+    return 'ok'
@@ -0,0 +1,227 @@
+import argparse
+import contextlib
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+import pandas as pd
+from integrated_farm_recommendations import (
+    farm_records_from_dataset,
+    generate_recommendations,
+    load_or_train_models
+)
+
+REPORT_DIR = 'reports'
+
+# Templates are parsed once at import, i.e. once per worker process
+page_template = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Farm report $farm_id</title>
+<style>
+body { font-family: sans-serif; max-width: 800px; margin: 2em auto; color: #222; }
+h1 { color: #2e7d32; border-bottom: 2px solid #2e7d32; }
+h2 { color: #2e7d32; margin-top: 1.5em; }
+table { border-collapse: collapse; }
+td, th { border: 1px solid #ccc; padding: 4px 10px; text-align: left; }
+.figure { font-size: 1.4em; font-weight: bold; }
+@media print { body { margin: 0; } }
+</style>
+</head>
+<body>
+<h1>Sustainable Farming Report &ndash; $farm_id</h1>
+<p>Generated $generated</p>
+<h2>Farm details</h2>
+<table>$details</table>
+$sections
+<h2>Additional Sustainable Practices</h2>
+<ol>
+<li>Use crop residue as organic matter</li>
+<li>Implement mulching</li>
+<li>Consider companion planting</li>
+<li>Regular soil testing every 6 months</li>
+<li>Maintain field borders for beneficial insects</li>
+</ol>
+</body>
+</html>
+""")
+
+section_template = Template("""<h2>$title</h2>
+$summary
+$body
+""")
+
+detail_row_template = Template("<tr><th>$label</th><td>$value</td></tr>")
+
+detail_fields = [
+    ('Current crop', 'current_crop'),
+    ('Previous crops', None),
+    ('Soil type', 'soil_type'),
+    ('Season', 'season'),
+    ('Farm area (acres)', 'farm_area'),
+    ('Organic matter (%)', 'organic_matter'),
+    ('Soil pH', 'soil_ph'),
+    ('Irrigation', 'irrigation_type'),
+    ('Fertilizer', 'current_fertilizer'),
+    ('Pesticide', 'current_pesticide')
+]
+
+def _render_lines(lines):
+    """Turn recommendation lines into headings and bullet lists"""
+    parts, items = [], []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('- '):
+            items.append(f"<li>{html.escape(line[2:])}</li>")
+            continue
+        if items:
+            parts.append("<ul>" + "".join(items) + "</ul>")
+            items = []
+        parts.append(f"<p><strong>{html.escape(line)}</strong></p>")
+    if items:
+        parts.append("<ul>" + "".join(items) + "</ul>")
+    return "\n".join(parts)
+
+def _figure(text):
+    return f'<p class="figure">{html.escape(text)}</p>'
+
+def render_report(record, bundle, generated=None):
+    """Render one self-contained HTML report from a recommendation bundle"""
+    farm_id = str(record.get('farm_id', 'farm'))
+    details = []
+    for label, key in detail_fields:
+        if key is None:
+            value = ", ".join(str(record.get(k, '')) for k in ('prev_crop1', 'prev_crop2', 'prev_crop3'))
+        else:
+            value = record.get(key, '')
+        details.append(detail_row_template.substitute(label=label, value=html.escape(str(value))))
+
+    rotation = bundle['crop_rotation']
+    yield_prediction = bundle['yield']
+    sections = [
+        section_template.substitute(
+            title="1. Crop Rotation",
+            summary=_figure(f"Recommended next crop: {rotation['next_crop']}"),
+            body=f"<p>Rotation diversity score: {rotation['rotation_score']:.1f}%</p>"
+        ),
+        section_template.substitute(title="2. Fertilizer Management", summary="",
+                                    body=_render_lines(bundle['fertilizer'])),
+        section_template.substitute(title="3. Pest Management", summary="",
+                                    body=_render_lines(bundle['pesticide'])),
+        section_template.substitute(title="4. Water Management", summary="",
+                                    body=_render_lines(bundle['water_management'])),
+        section_template.substitute(
+            title="5. Yield Prediction",
+            summary=_figure(f"{yield_prediction['per_acre']} tons per acre, "
+                            f"{yield_prediction['total']} tons in total"),
+            body=f"<p>Weather impact factor: {yield_prediction['weather_impact']}</p>"
+        ),
+        section_template.substitute(
+            title="Weather",
+            summary=f"<p>Impact factor: {bundle['weather']['impact']:.2f}</p>",
+            body=_render_lines(bundle['weather']['recommendations'])
+        ),
+        section_template.substitute(
+            title="Water Quality",
+            summary=f"<p>Impact factor: {bundle['water_quality']['impact']:.2f}</p>",
+            body=_render_lines(bundle['water_quality']['recommendations'])
+        )
+    ]
+
+    return page_template.substitute(
+        farm_id=html.escape(farm_id),
+        generated=html.escape(generated or time.strftime('%Y-%m-%d %H:%M')),
+        details="\n".join(details),
+        sections="\n".join(sections)
+    )
+
+def report_filenames(records):
+    """One distinct, filesystem-safe file name per record.
+
+    Characters other than letters, digits, '_', '-' and '.' become '_' and
+    leading dots are dropped, so a farm_id cannot leave the output
+    directory. Records without a usable farm_id are named by position, and
+    repeated names get a -2, -3, ... suffix instead of overwriting each
+    other (compared case-insensitively, for case-insensitive filesystems).
+    """
+    names, taken = [], set()
+    for i, record in enumerate(records):
+        farm_id = record.get('farm_id')
+        stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', '' if farm_id is None else str(farm_id)).lstrip('.')[:100]
+        stem = stem or f'farm_{i:06d}'
+        name, suffix = stem, 1
+        while name.lower() in taken:
+            suffix += 1
+            name = f'{stem}-{suffix}'
+        taken.add(name.lower())
+        names.append(f'{name}.html')
+    return names
+
+def _write_reports(scored, output_dir, generated):
+    for record, bundle, filename in scored:
+        with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(render_report(record, bundle, generated))
+    return len(scored)
+
+def generate_reports(scored, output_dir=REPORT_DIR, workers=None, chunk_size=200):
+    """Render (record, bundle) pairs to HTML files across a process pool.
+
+    Returns (number of reports, reports per second).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    scored = list(scored)
+    filenames = report_filenames([record for record, _ in scored])
+    # Records without a farm_id are titled with their file name
+    scored = [(record if 'farm_id' in record else {**record, 'farm_id': os.path.splitext(filename)[0]},
+               bundle, filename)
+              for (record, bundle), filename in zip(scored, filenames)]
+    generated = time.strftime('%Y-%m-%d %H:%M')
+    chunks = [scored[i:i + chunk_size] for i in range(0, len(scored), chunk_size)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        written = sum(_write_reports(chunk, output_dir, generated) for chunk in chunks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            written = sum(executor.map(_write_reports, chunks,
+                                       [output_dir] * len(chunks), [generated] * len(chunks)))
+    elapsed = time.perf_counter() - start
+    return written, written / elapsed if elapsed > 0 else float('inf')
+
+def read_scored_jsonl(stream):
+    """Read (record, bundle) pairs from the CLI's --jsonl output, skipping errors"""
+    for line in stream:
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        if 'recommendations' in result:
+            yield result['input'], result['recommendations']
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render printable HTML reports for many farms")
+    parser.add_argument('--input', help="JSON-lines output of 'integrated_farm_recommendations.py --jsonl'")
+    parser.add_argument('--sample', type=int, default=1000,
+                        help="without --input, score this many farms from the dataset")
+    parser.add_argument('--output-dir', default=REPORT_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input) as f:
+            scored = list(read_scored_jsonl(f))
+    else:
+        with contextlib.redirect_stdout(sys.stderr):
+            models = load_or_train_models()
+        data = pd.read_csv('sustainable_farming_dataset.csv')
+        records = farm_records_from_dataset(data.head(args.sample)).to_dict('records')
+        scored = [(record, generate_recommendations(record, models)) for record in records]
+
+    count, rate = generate_reports(scored, args.output_dir, args.workers)
+    print(f"Wrote {count} reports to {args.output_dir}/ at {rate:.0f} reports/sec")
@@ -0,0 +1,141 @@
+import argparse
+import contextlib
+import sqlite3
+import sys
+import time
+import pandas as pd
+import numpy as np
+import joblib
+from integrated_farm_recommendations import (
+    yield_categorical_features,
+    yield_numerical_features,
+    build_yield_features,
+    encode_yield_features,
+    calculate_weather_impacts,
+    farm_records_from_dataset,
+    load_or_train_models
+)
+
+STORE_PATH = 'farm_features.db'
+
+# Raw farm record fields kept so encoded rows can be rebuilt after partial updates
+raw_columns = [
+    'current_crop', 'prev_crop1', 'prev_crop2', 'prev_crop3', 'soil_type', 'season',
+    'organic_matter', 'soil_ph', 'current_fertilizer', 'fertilizer_category',
+    'current_pesticide', 'pesticide_category', 'irrigation_type', 'farm_area',
+    'temperature', 'rainfall_level', 'water_ph', 'salinity_level'
+]
+model_features = yield_categorical_features + yield_numerical_features
+encoded_columns = [f'f{i}' for i in range(len(model_features))]
+
+def encoder_version(models):
+    """Fingerprint of the encoders that produced the stored feature rows"""
+    return joblib.hash((models['yield_le_dict'], models['yield_scaler']))
+
+def open_store(path=STORE_PATH):
+    """Open (and create if needed) the SQLite feature store"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    columns = ", ".join(raw_columns + [f"{col} REAL" for col in encoded_columns])
+    # WITHOUT ROWID clusters rows by farm_id, so a lookup is one B-tree search
+    conn.execute(f"CREATE TABLE IF NOT EXISTS farm_features "
+                 f"(farm_id TEXT PRIMARY KEY, {columns}) WITHOUT ROWID")
+    conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+def _encoded_rows(farms, models):
+    features = build_yield_features(farms)
+    return encode_yield_features(features, models['yield_le_dict'], models['yield_scaler']).to_numpy(dtype=float)
+
+def _check_version(conn, models):
+    version = encoder_version(models)
+    stored = conn.execute("SELECT value FROM store_meta WHERE key = 'encoder_version'").fetchone()
+    if stored is None:
+        conn.execute("INSERT INTO store_meta VALUES ('encoder_version', ?)", (version,))
+    elif stored[0] != version:
+        raise ValueError("Feature store was encoded with different encoders; run reencode_store() first")
+
+def upsert_farms(conn, farms, models, chunk_size=50000):
+    """Insert or replace farms (a DataFrame of farm records with farm_id)"""
+    _check_version(conn, models)
+    placeholders = ", ".join("?" * (1 + len(raw_columns) + len(encoded_columns)))
+    with conn:
+        for start in range(0, len(farms), chunk_size):
+            chunk = farms.iloc[start:start + chunk_size]
+            encoded = _encoded_rows(chunk, models)
+            raw = chunk[['farm_id'] + raw_columns].astype(object).to_numpy()
+            conn.executemany(f"INSERT OR REPLACE INTO farm_features VALUES ({placeholders})",
+                             (tuple(r) + tuple(e) for r, e in zip(raw, encoded)))
+    return len(farms)
+
+def fetch_farms(conn, farm_ids, columns=None):
+    """Bulk-fetch stored rows in the order of farm_ids (missing ids are dropped)"""
+    columns = columns or ['farm_id'] + raw_columns + encoded_columns
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (pos INTEGER PRIMARY KEY, farm_id TEXT)")
+    with conn:
+        conn.execute("DELETE FROM wanted")
+        conn.executemany("INSERT INTO wanted VALUES (?, ?)", enumerate(map(str, farm_ids)))
+        rows = conn.execute(
+            f"SELECT {', '.join('f.' + c for c in columns)} FROM wanted w "
+            f"JOIN farm_features f ON f.farm_id = w.farm_id ORDER BY w.pos"
+        ).fetchall()
+    return pd.DataFrame(rows, columns=columns)
+
+def update_farm(conn, farm_id, models, **changes):
+    """Change some raw fields of one farm and recompute its encoded row"""
+    unknown = set(changes) - set(raw_columns)
+    if unknown:
+        raise ValueError(f"Unknown farm fields: {sorted(unknown)}")
+    current = fetch_farms(conn, [farm_id], ['farm_id'] + raw_columns)
+    if current.empty:
+        raise KeyError(farm_id)
+    for key, value in changes.items():
+        current[key] = value
+    upsert_farms(conn, current, models)
+
+def reencode_store(conn, models, chunk_size=50000):
+    """Rebuild every encoded row from the stored raw fields for new models"""
+    with conn:
+        conn.execute("DELETE FROM store_meta WHERE key = 'encoder_version'")
+    ids = [row[0] for row in conn.execute("SELECT farm_id FROM farm_features")]
+    for start in range(0, len(ids), chunk_size):
+        upsert_farms(conn, fetch_farms(conn, ids[start:start + chunk_size],
+                                       ['farm_id'] + raw_columns), models)
+
+def predict_by_id(conn, farm_ids, models):
+    """Yield predictions for stored farms: one indexed fetch plus one predict"""
+    _check_version(conn, models)
+    rows = fetch_farms(conn, farm_ids, ['farm_id', 'farm_area', 'temperature', 'rainfall_level']
+                       + encoded_columns)
+    encoded = pd.DataFrame(rows[encoded_columns].to_numpy(dtype=float), columns=model_features)
+    weather = calculate_weather_impacts(rows['temperature'].astype(float), rows['rainfall_level'])
+    per_acre = models['yield_model'].predict(encoded) * weather
+    return pd.DataFrame({
+        'farm_id': rows['farm_id'],
+        'per_acre': np.round(per_acre, 2),
+        'total': np.round(per_acre * rows['farm_area'].astype(float).to_numpy(), 2),
+        'weather_impact': weather
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Farm_ID-keyed feature store for yield scoring")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    load_parser = subparsers.add_parser('load', help="load farms from the dataset CSV")
+    load_parser.add_argument('--data', default='sustainable_farming_dataset.csv')
+    predict_parser = subparsers.add_parser('predict', help="predict yield for stored Farm_IDs")
+    predict_parser.add_argument('farm_ids', nargs='+')
+    parser.add_argument('--store', default=STORE_PATH)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        models = load_or_train_models()
+    conn = open_store(args.store)
+    start = time.perf_counter()
+    if args.command == 'load':
+        count = upsert_farms(conn, farm_records_from_dataset(pd.read_csv(args.data)), models)
+        print(f"Stored {count} farms in {time.perf_counter() - start:.2f}s")
+    else:
+        predictions = predict_by_id(conn, args.farm_ids, models)
+        print(predictions.to_string(index=False))
+        print(f"\n{(time.perf_counter() - start) * 1000:.1f} ms")
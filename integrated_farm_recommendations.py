@@ -1,3 +1,12 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import weakref
+from functools import partial
+from multiprocessing import Pool
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
@@ -8,9 +17,16 @@ from datetime import datetime
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import mean_squared_error, accuracy_score
+from yield_explanations import forest_contributions
+from yield_intervals import prediction_intervals
+from recommendation_history import HistoryWriter, HISTORY_PATH
 
 df = pd.read_csv('sustainable_farming_dataset.csv')
 
+MODEL_PATH = 'farm_models.joblib'
+
+_versions = weakref.WeakKeyDictionary()
+
 crop_patterns = {
     'Rice': ['Wheat', 'Potato', 'Maize'],
     'Wheat': ['Rice', 'Soybean', 'Maize'],
@@ -91,6 +107,24 @@ water_quality_parameters = {
     }
 }
 
+# Features used by the yield model, in the order the model expects them
+yield_categorical_features = [
+    'Current_Crop',
+    'Soil_Type',
+    'Season',
+    'Fertilizer_Category',
+    'Irrigation_Type'
+]
+
+yield_numerical_features = [
+    'Organic_Matter_Content(%)',
+    'Soil_pH',
+    'Water_Usage(cubic meters)',
+    'Rotation_Health_Score',
+    'Fertilizer_Used(tons)',
+    'Pesticide_Used(kg)'
+]
+
 def get_crop_recommendation(current_crop, prev_crops, season, soil_type):
     if current_crop in crop_patterns:
         return np.random.choice(crop_patterns[current_crop])
@@ -145,29 +179,48 @@ def get_pesticide_recommendation(current_pesticide, pesticide_category, crop, se
     
     return recommendations
 
-def train_yield_prediction_model():
-    """Train model to predict crop yield"""
+# Strata of the representative training subset
+coreset_strata = ['Current_Crop', 'Soil_Type', 'Season', 'Irrigation_Type']
+
+def stratified_coreset(data, size=None, min_per_stratum=5, random_state=42):
+    """Sorted row positions of a stratified representative subset of data.
+
+    Rows are grouped by crop x soil x season x irrigation and each group is
+    sampled in proportion to its size, with at least min_per_stratum rows
+    (or the whole group if smaller). Without a size the target is
+    20 * sqrt(n) rows, so large datasets shrink by orders of magnitude
+    while every stratum stays represented.
+    """
+    n = len(data)
+    groups = data.groupby(coreset_strata, sort=False, dropna=False).ngroup().to_numpy()
+    counts = np.bincount(groups)
+    size = int(20 * np.sqrt(n)) if size is None else int(size)
+    size = min(max(size, len(counts) * min_per_stratum), n)
+    quota = np.minimum(counts, np.maximum(min_per_stratum, np.round(size * counts / n))).astype(int)
+
+    # Rank every row within its stratum in a random order, keep the first quota
+    order = np.random.default_rng(random_state).permutation(n)
+    shuffled_groups = groups[order]
+    by_group = np.argsort(shuffled_groups, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(n, dtype=np.int64)
+    rank[by_group] = np.arange(n) - starts[shuffled_groups[by_group]]
+    return np.sort(order[rank < quota[shuffled_groups]])
+
+def train_yield_prediction_model(model_params=None, coreset=None, data=None):
+    """Train model to predict crop yield
+
+    coreset=True fits the forest on an automatically sized stratified
+    subset (see stratified_coreset), an integer sets the subset size.
+    Encoders and scaler are always fitted on the full data.
+    """
     try:
-        df = pd.read_csv('sustainable_farming_dataset.csv')
+        df = pd.read_csv('sustainable_farming_dataset.csv') if data is None else data.copy()
         print("Dataset loaded successfully")
         
         # Separate categorical and numerical features
-        categorical_features = [
-            'Current_Crop',
-            'Soil_Type',
-            'Season',
-            'Fertilizer_Category',
-            'Irrigation_Type'
-        ]
-        
-        numerical_features = [
-            'Organic_Matter_Content(%)',
-            'Soil_pH',
-            'Water_Usage(cubic meters)',
-            'Rotation_Health_Score',
-            'Fertilizer_Used(tons)',
-            'Pesticide_Used(kg)'
-        ]
+        categorical_features = yield_categorical_features
+        numerical_features = yield_numerical_features
         
         # Initialize transformers
         le_dict = {}  # Dictionary to store a LabelEncoder for each categorical column
@@ -184,9 +237,15 @@ def train_yield_prediction_model():
         # Combine features
         X = df[categorical_features + numerical_features]
         y = df['Yield(tons)']
+        if coreset:
+            rows = stratified_coreset(df, None if coreset is True else coreset)
+            print(f"Training on a coreset of {len(rows)} of {len(df)} rows")
+            X, y = X.iloc[rows], y.iloc[rows]
         
         # Train model
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
+        params = {'n_estimators': 100, 'random_state': 42}
+        params.update(model_params or {})
+        model = RandomForestRegressor(**params)
         model.fit(X, y)
         
         # Print model performance
@@ -200,10 +259,13 @@ def train_yield_prediction_model():
         print(f"Available columns in dataset: {df.columns.tolist()}")
         raise
 
-def train_crop_recommendation_model():
-    """Train model to recommend next crop"""
+def train_crop_recommendation_model(coreset=None, data=None):
+    """Train model to recommend next crop
+
+    coreset works as in train_yield_prediction_model().
+    """
     try:
-        df = pd.read_csv('sustainable_farming_dataset.csv')
+        df = pd.read_csv('sustainable_farming_dataset.csv') if data is None else data
         
         # Use exact column names from dataset
         features = [
@@ -241,6 +303,9 @@ def train_crop_recommendation_model():
         # Encode categorical variables
         for col in categorical_cols:
             X[col] = le.fit_transform(X[col])
+        if coreset:
+            rows = stratified_coreset(df, None if coreset is True else coreset)
+            X, y = X.iloc[rows], y.iloc[rows]
         
         # Train model
         model = RandomForestClassifier(n_estimators=100, random_state=42)
@@ -260,67 +325,68 @@ def calculate_rotation_score(current_crop, prev1, prev2, prev3):
     # Score from 0-100 based on crop diversity
     return (unique_crops / 4) * 100
 
+# Base water usage per acre (cubic meters)
+water_usage_per_acre = {
+    'Drip': 3000,
+    'Sprinkler': 4000,
+    'Flood': 6000,
+    'Manual': 4500,
+    'Rain-fed': 2000
+}
+
+# Base fertilizer usage per acre (tons)
+fertilizer_usage_per_acre = {
+    'Chemical': 0.5,
+    'Organic': 1.2,
+    'Mixed': 0.8
+}
+
+# Base pesticide usage per acre (kg)
+pesticide_usage_per_acre = {
+    'Chemical': 2.0,
+    'Organic': 3.0,
+    'Mixed': 2.5
+}
+
+# Rainfall impact on yield (0-1)
+rainfall_yield_impact = {
+    'Low': 0.6,
+    'Moderate': 1.0,
+    'High': 0.8
+}
+
 def calculate_water_usage(farm_area, irrigation_type):
     """Estimate water usage based on irrigation type and farm area"""
-    # Base water usage per acre (cubic meters)
-    base_usage = {
-        'Drip': 3000,
-        'Sprinkler': 4000,
-        'Flood': 6000,
-        'Manual': 4500,
-        'Rain-fed': 2000
-    }
-    return base_usage.get(irrigation_type, 4000) * farm_area
+    return water_usage_per_acre.get(irrigation_type, 4000) * farm_area
 
 def calculate_fertilizer_usage(farm_area, category):
     """Estimate fertilizer usage based on farm area and category"""
-    # Base fertilizer usage per acre (tons)
-    base_usage = {
-        'Chemical': 0.5,
-        'Organic': 1.2,
-        'Mixed': 0.8
-    }
-    return base_usage.get(category, 0.8) * farm_area
+    return fertilizer_usage_per_acre.get(category, 0.8) * farm_area
 
 def calculate_pesticide_usage(farm_area, category):
     """Estimate pesticide usage based on farm area and category"""
-    # Base pesticide usage per acre (kg)
-    base_usage = {
-        'Chemical': 2.0,
-        'Organic': 3.0,
-        'Mixed': 2.5
-    }
-    return base_usage.get(category, 2.5) * farm_area
+    return pesticide_usage_per_acre.get(category, 2.5) * farm_area
 
 def calculate_weather_impact(temperature, rainfall_level):
-    """Calculate weather impact on yield (0-1 scale)"""
-    # Optimal temperature range for most crops
-    optimal_temp_min = 15
-    optimal_temp_max = 30
-    
-    # Temperature impact (0-1)
-    if optimal_temp_min <= temperature <= optimal_temp_max:
-        temp_impact = 1.0
-    else:
-        temp_impact = max(0, 1 - abs(temperature - optimal_temp_max) / 20)
-    
-    # Rainfall impact (0-1)
-    rainfall_impact = {
-        'Low': 0.6,
-        'Moderate': 1.0,
-        'High': 0.8
-    }
-    
-    # Combined impact
-    weather_impact = (temp_impact + rainfall_impact.get(rainfall_level, 0.7)) / 2
-    return round(weather_impact, 2)
+    """Calculate weather impact on yield (0-1 scale)
+
+    Delegates to calculate_weather_impacts() so single and batch
+    predictions round the factor identically.
+    """
+    return float(calculate_weather_impacts([temperature], [rainfall_level])[0])
 
 def predict_yield(current_crop, soil_type, season, organic_matter, soil_ph,
                  fertilizer_category, irrigation_type, farm_area,
                  water_usage, rotation_score, fertilizer_usage, pesticide_usage,
                  temperature, rainfall_level,  # Add these parameters
-                 model, le_dict, scaler):
-    """Predict yield based on input parameters"""
+                 model, le_dict, scaler, explain=False, interval=None):
+    """Predict yield based on input parameters
+
+    With explain=True the result also holds per-feature contributions
+    (tons per acre, after the weather adjustment) and the baseline they
+    are added to. With interval set to a coverage such as 0.9 it also
+    holds [low, high] ranges taken from the spread of the forest's trees.
+    """
     try:
         # Create input DataFrame with numerical values
         input_data = pd.DataFrame({
@@ -365,20 +431,171 @@ def predict_yield(current_crop, soil_type, season, organic_matter, soil_ph,
         weather_impact = calculate_weather_impact(temperature, rainfall_level)
         
         # Adjust yield prediction based on weather impact
-        predicted_yield = model.predict(input_data)[0] * weather_impact
+        if interval:
+            # The tree mean is the forest prediction, so one pass gives both
+            mean, low, high = prediction_intervals(model, input_data, interval, n_jobs=1)
+            predicted_yield = mean[0] * weather_impact
+        else:
+            predicted_yield = model.predict(input_data)[0] * weather_impact
         
-        return {
-            'per_acre': round(predicted_yield, 2),
-            'total': round(predicted_yield * farm_area, 2),
+        # np.round, as in predict_yield_batch, so both paths agree to the cent
+        result = {
+            'per_acre': float(np.round(predicted_yield, 2)),
+            'total': float(np.round(predicted_yield * farm_area, 2)),
             'weather_impact': weather_impact
         }
         
+        if interval:
+            result['per_acre_interval'] = [float(np.round(low[0] * weather_impact, 2)),
+                                           float(np.round(high[0] * weather_impact, 2))]
+            result['total_interval'] = [float(np.round(low[0] * weather_impact * farm_area, 2)),
+                                        float(np.round(high[0] * weather_impact * farm_area, 2))]
+        
+        if explain:
+            baseline, contributions = forest_contributions(model, input_data)
+            result['baseline'] = float(np.round(baseline * weather_impact, 2))
+            result['contributions'] = {
+                col: float(np.round(float(value) * weather_impact, 3))
+                for col, value in zip(input_data.columns, contributions[0])
+            }
+        
+        return result
+        
     except Exception as e:
         print(f"Error in yield prediction: {str(e)}")
         if 'input_data' in locals():
             print(f"Input data types: {input_data.dtypes}")
         raise
 
+def calculate_rotation_scores(current_crops, prev1, prev2, prev3):
+    """Vectorized calculate_rotation_score over arrays of crops"""
+    a, b, c, d = (np.asarray(x, dtype=object) for x in (current_crops, prev1, prev2, prev3))
+    unique_crops = (1 + (b != a)
+                    + ((c != a) & (c != b))
+                    + ((d != a) & (d != b) & (d != c)))
+    return unique_crops.astype(float) / 4 * 100
+
+def temperature_yield_impacts(temperature):
+    """Temperature part of calculate_weather_impacts() (0-1 scale) over an array of readings"""
+    # Optimal temperature range for most crops
+    optimal_temp_min = 15
+    optimal_temp_max = 30
+    
+    temperature = np.asarray(temperature, dtype=float)
+    return np.where(
+        (temperature >= optimal_temp_min) & (temperature <= optimal_temp_max),
+        1.0,
+        np.maximum(0, 1 - np.abs(temperature - optimal_temp_max) / 20)
+    )
+
+def combine_weather_impacts(temperature_impact, rainfall_level):
+    """Weather impact from temperature impacts and rainfall levels, rounded as in predictions"""
+    rainfall_impact = pd.Series(rainfall_level).map(rainfall_yield_impact).fillna(0.7).to_numpy()
+    # Drop float noise first, so an average of identical days rounds like one day
+    temperature_impact = np.round(np.asarray(temperature_impact, dtype=float), 6)
+    return np.round((temperature_impact + rainfall_impact) / 2, 2)
+
+def calculate_weather_impacts(temperature, rainfall_level):
+    """Calculate weather impact on yield (0-1 scale) over arrays of readings"""
+    return combine_weather_impacts(temperature_yield_impacts(temperature), rainfall_level)
+
+def build_yield_features(farms):
+    """Build raw yield model features for a DataFrame of farm records.
+
+    Column names follow the keys used by generate_recommendations().
+    """
+    area = farms['farm_area'].astype(float).to_numpy()
+    return pd.DataFrame({
+        'Current_Crop': farms['current_crop'].to_numpy(),
+        'Soil_Type': farms['soil_type'].to_numpy(),
+        'Season': farms['season'].to_numpy(),
+        'Fertilizer_Category': farms['fertilizer_category'].to_numpy(),
+        'Irrigation_Type': farms['irrigation_type'].to_numpy(),
+        'Organic_Matter_Content(%)': farms['organic_matter'].astype(float).to_numpy(),
+        'Soil_pH': farms['soil_ph'].astype(float).to_numpy(),
+        'Water_Usage(cubic meters)':
+            farms['irrigation_type'].map(water_usage_per_acre).fillna(4000).to_numpy() * area,
+        'Rotation_Health_Score': calculate_rotation_scores(
+            farms['current_crop'], farms['prev_crop1'], farms['prev_crop2'], farms['prev_crop3']
+        ),
+        'Fertilizer_Used(tons)':
+            farms['fertilizer_category'].map(fertilizer_usage_per_acre).fillna(0.8).to_numpy() * area,
+        'Pesticide_Used(kg)':
+            farms['pesticide_category'].map(pesticide_usage_per_acre).fillna(2.5).to_numpy() * area
+    })
+
+def encode_yield_features(features, le_dict, scaler):
+    """Encode and scale raw yield features the same way as predict_yield"""
+    encoded = features[yield_categorical_features + yield_numerical_features].copy()
+    for col in yield_categorical_features:
+        encoded[col] = le_dict[col].transform(encoded[col])
+    encoded[yield_numerical_features] = scaler.transform(encoded[yield_numerical_features])
+    return encoded
+
+def predict_yield_batch(farms, model, le_dict, scaler, explain=False, interval=None,
+                        weather_impact=None):
+    """Predict yield for many farms with a single model call
+
+    weather_impact, if given, is one factor per farm (e.g. from
+    seasonal_weather) used instead of the temperature/rainfall_level
+    columns. With explain=True one extra column per model feature holds its
+    contribution to per_acre, plus a 'baseline' column. With interval set
+    to a coverage such as 0.9, per_acre_low/high and total_low/high
+    columns are added.
+    """
+    encoded = encode_yield_features(build_yield_features(farms), le_dict, scaler)
+    if weather_impact is None:
+        weather = calculate_weather_impacts(farms['temperature'], farms['rainfall_level'])
+    else:
+        weather = np.asarray(weather_impact, dtype=float)
+    area = farms['farm_area'].astype(float).to_numpy()
+    if interval:
+        mean, low, high = prediction_intervals(model, encoded, interval)
+        per_acre = mean * weather
+    else:
+        per_acre = model.predict(encoded) * weather
+    result = pd.DataFrame({
+        'per_acre': np.round(per_acre, 2),
+        'total': np.round(per_acre * area, 2),
+        'weather_impact': weather
+    }, index=farms.index)
+    if interval:
+        result['per_acre_low'] = np.round(low * weather, 2)
+        result['per_acre_high'] = np.round(high * weather, 2)
+        result['total_low'] = np.round(low * weather * area, 2)
+        result['total_high'] = np.round(high * weather * area, 2)
+    if explain:
+        baseline, contributions = forest_contributions(model, encoded)
+        result['baseline'] = np.round(baseline * weather, 2)
+        for i, col in enumerate(encoded.columns):
+            result[col] = np.round(contributions[:, i] * weather, 3)
+    return result
+
+def farm_records_from_dataset(data):
+    """Map dataset rows to the farm record columns used by the batch functions"""
+    return pd.DataFrame({
+        'farm_id': data['Farm_ID'].to_numpy(),
+        'current_crop': data['Current_Crop'].to_numpy(),
+        'prev_crop1': data['Previous_Crop_1'].to_numpy(),
+        'prev_crop2': data['Previous_Crop_2'].to_numpy(),
+        'prev_crop3': data['Previous_Crop_3'].to_numpy(),
+        'soil_type': data['Soil_Type'].to_numpy(),
+        'season': data['Season'].to_numpy(),
+        'organic_matter': data['Organic_Matter_Content(%)'].to_numpy(),
+        'soil_ph': data['Soil_pH'].to_numpy(),
+        'current_fertilizer': data['Current_Fertilizer'].to_numpy(),
+        'fertilizer_category': data['Fertilizer_Category'].to_numpy(),
+        'current_pesticide': data['Current_Pesticide'].to_numpy(),
+        'pesticide_category': data['Pesticide_Category'].to_numpy(),
+        'irrigation_type': data['Irrigation_Type'].to_numpy(),
+        'farm_area': data['Farm_Area(acres)'].to_numpy(),
+        # The dataset has no weather or water readings, so use neutral conditions
+        'temperature': 25.0,
+        'rainfall_level': 'Moderate',
+        'water_ph': 7.0,
+        'salinity_level': 'Low'
+    })
+
 def get_water_management_recommendation(crop, season, soil_type, irrigation_type, farm_area):
     """Generate water management recommendations"""
     
@@ -490,10 +707,18 @@ def assess_water_quality(water_ph, salinity_level):
     
     return ph_impact * salinity_impact, recommendations
 
-def initialize_models():
-    """Initialize and return trained models"""
-    yield_model, yield_le_dict, yield_scaler = train_yield_prediction_model()
-    crop_model, crop_le = train_crop_recommendation_model()
+def initialize_models(on_progress=None, coreset=None):
+    """Initialize and return trained models
+
+    on_progress, if given, is called with (fraction done, message).
+    coreset is passed on to both training functions.
+    """
+    on_progress = on_progress or (lambda fraction, message: None)
+    on_progress(0.0, "Training yield prediction model")
+    yield_model, yield_le_dict, yield_scaler = train_yield_prediction_model(coreset=coreset)
+    on_progress(0.6, "Training crop recommendation model")
+    crop_model, crop_le = train_crop_recommendation_model(coreset=coreset)
+    on_progress(1.0, "Models ready")
     return {
         'yield_model': yield_model,
         'yield_le_dict': yield_le_dict,
@@ -502,7 +727,232 @@ def initialize_models():
         'crop_le': crop_le
     }
 
-def main():
+def training_mode(coreset=None):
+    """How models were fit: 'full', 'coreset' (automatic size) or 'coreset-<size>'"""
+    if not coreset:
+        return 'full'
+    return 'coreset' if coreset is True else f'coreset-{coreset}'
+
+def model_cache_path(model_path=MODEL_PATH, coreset=None):
+    """Where models of a training mode are saved; coreset models never share the full-data file"""
+    if not coreset:
+        return model_path
+    root, ext = os.path.splitext(model_path)
+    return f"{root}.{training_mode(coreset)}{ext}"
+
+def load_or_train_models(model_path=MODEL_PATH, retrain=False, on_progress=None, coreset=None):
+    """Load trained models from disk, training and saving them if missing
+
+    Coreset models are saved next to model_path under their own name (see
+    model_cache_path) and the bundle records its training_mode(), so a run
+    without coreset never serves subset-trained forests. A saved bundle
+    whose mode does not match is retrained.
+    """
+    path = model_cache_path(model_path, coreset)
+    mode = training_mode(coreset)
+    if not retrain and os.path.exists(path):
+        if on_progress:
+            on_progress(0.0, "Loading saved models")
+        models = joblib.load(path)
+        # Bundles saved before the mode was recorded were trained on all rows
+        if models.get('training_mode', 'full') == mode:
+            if on_progress:
+                on_progress(1.0, "Models ready")
+            return models
+    models = initialize_models(on_progress, coreset)
+    models['training_mode'] = mode
+    joblib.dump(models, path)
+    return models
+
+def model_version(models):
+    """Short fingerprint of the yield model's trees, cached per model object.
+
+    Hashing the tree arrays rather than the estimator keeps the fingerprint
+    stable across pickling round trips.
+    """
+    model = models['yield_model']
+    if model not in _versions:
+        trees = [(tree.tree_.feature, tree.tree_.threshold, tree.tree_.value) for tree in model.estimators_]
+        _versions[model] = joblib.hash(trees)[:12]
+    return _versions[model]
+
+def generate_recommendations(record, models, explain=False):
+    """Build the full recommendation bundle for one farm record
+
+    With explain=True the yield entry also holds the prediction's
+    'baseline' and per-feature 'contributions' (see predict_yield).
+    """
+    current_crop = record['current_crop']
+    prev_crop1 = record['prev_crop1']
+    prev_crop2 = record['prev_crop2']
+    prev_crop3 = record['prev_crop3']
+    soil_type = record['soil_type']
+    season = record['season']
+    organic_matter = float(record['organic_matter'])
+    soil_ph = float(record['soil_ph'])
+    fertilizer_category = record['fertilizer_category']
+    pesticide_category = record['pesticide_category']
+    irrigation_type = record['irrigation_type']
+    farm_area = float(record['farm_area'])
+    temperature = float(record['temperature'])
+    rainfall_level = record['rainfall_level']
+
+    next_crop = get_crop_recommendation(current_crop,
+                                      [prev_crop1, prev_crop2, prev_crop3],
+                                      season, soil_type)
+    rotation_score = calculate_rotation_score(
+        current_crop, prev_crop1, prev_crop2, prev_crop3
+    )
+
+    yield_prediction = predict_yield(
+        current_crop=current_crop,
+        soil_type=soil_type,
+        season=season,
+        organic_matter=organic_matter,
+        soil_ph=soil_ph,
+        fertilizer_category=fertilizer_category,
+        irrigation_type=irrigation_type,
+        farm_area=farm_area,
+        water_usage=calculate_water_usage(farm_area, irrigation_type),
+        rotation_score=rotation_score,
+        fertilizer_usage=calculate_fertilizer_usage(farm_area, fertilizer_category),
+        pesticide_usage=calculate_pesticide_usage(farm_area, pesticide_category),
+        temperature=temperature,
+        rainfall_level=rainfall_level,
+        model=models['yield_model'],
+        le_dict=models['yield_le_dict'],
+        scaler=models['yield_scaler'],
+        explain=explain
+    )
+
+    weather_factor, weather_recs = assess_weather_impact(current_crop, temperature, rainfall_level)
+    water_quality_factor, water_quality_recs = assess_water_quality(
+        float(record['water_ph']), record['salinity_level']
+    )
+
+    bundle = {
+        'crop_rotation': {
+            'next_crop': str(next_crop),
+            'rotation_score': rotation_score
+        },
+        'fertilizer': get_fertilizer_recommendation(
+            soil_type, current_crop, organic_matter, soil_ph,
+            record['current_fertilizer'], fertilizer_category
+        ),
+        'pesticide': get_pesticide_recommendation(
+            record['current_pesticide'], pesticide_category, current_crop, season
+        ),
+        'yield': {
+            'per_acre': float(yield_prediction['per_acre']),
+            'total': float(yield_prediction['total']),
+            'weather_impact': float(yield_prediction['weather_impact'])
+        },
+        'weather': {
+            'impact': float(weather_factor),
+            'recommendations': weather_recs
+        },
+        'water_quality': {
+            'impact': float(water_quality_factor),
+            'recommendations': water_quality_recs
+        },
+        'water_management': get_water_management_recommendation(
+            current_crop, season, soil_type, irrigation_type, farm_area
+        )
+    }
+    if explain:
+        bundle['yield']['baseline'] = yield_prediction['baseline']
+        bundle['yield']['contributions'] = yield_prediction['contributions']
+    return bundle
+
+_worker_models = None
+
+def _init_jsonl_worker(model_path, shared_model_dir=None):
+    global _worker_models
+    with contextlib.redirect_stdout(sys.stderr):
+        if shared_model_dir:
+            # Memory-mapped forest: all workers share one physical copy
+            from shared_model import load_shared_models
+            _worker_models = load_shared_models(shared_model_dir)
+        else:
+            _worker_models = joblib.load(model_path)
+
+def _process_jsonl_line(line, models=None, with_result=False):
+    """Turn one JSON input line into one JSON output line.
+
+    With with_result=True, returns (output line, result dict, latency ms)
+    so the caller can log the recommendation.
+    """
+    models = models if models is not None else _worker_models
+    start = time.perf_counter()
+    try:
+        record = json.loads(line)
+        # Diagnostic prints from the model code must not corrupt the output stream
+        with contextlib.redirect_stdout(sys.stderr):
+            bundle = generate_recommendations(record, models)
+        result = {'input': record, 'recommendations': bundle}
+    except Exception as e:
+        result = {'input': line.strip(), 'error': str(e)}
+    if with_result:
+        return json.dumps(result), result, (time.perf_counter() - start) * 1000
+    return json.dumps(result)
+
+def run_jsonl(input_stream=sys.stdin, output_stream=sys.stdout,
+              model_path=MODEL_PATH, workers=1, retrain=False, shared_model_dir=None,
+              history_path=None, shadow_model_path=None, coreset=None):
+    """Read farm records as JSON lines and write recommendation bundles as JSON lines
+
+    With history_path, every successful recommendation is also appended to
+    the recommendation history through a background writer. With
+    shadow_model_path, a candidate yield model scores the same farms in a
+    shadow process and its summary is written to shadow_summary.json.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        models = load_or_train_models(model_path, retrain=retrain, coreset=coreset)
+        if shared_model_dir:
+            from shared_model import export_shared_models, shared_model_version
+            # Re-export whenever the copy on disk is not the model just loaded
+            if retrain or shared_model_version(shared_model_dir) != model_version(models):
+                export_shared_models(models, shared_model_dir)
+
+    history = HistoryWriter(history_path) if history_path else None
+    version = model_version(models) if history else None
+    shadow = None
+    if shadow_model_path:
+        from shadow_evaluation import ShadowEvaluator, SUMMARY_PATH
+        shadow = ShadowEvaluator(shadow_model_path, summary_path=SUMMARY_PATH)
+    process = partial(_process_jsonl_line, with_result=bool(history or shadow))
+
+    def emit(output):
+        if history or shadow:
+            output, result, latency_ms = output
+            if 'recommendations' in result:
+                if history:
+                    history.record(result['input'], result['recommendations'], latency_ms, 'cli', version)
+                if shadow:
+                    prediction = result['recommendations']['yield']
+                    shadow.submit(result['input'], prediction['per_acre'], prediction['weather_impact'])
+        output_stream.write(output + '\n')
+        output_stream.flush()
+
+    lines = (line for line in input_stream if line.strip())
+    try:
+        if workers > 1:
+            with Pool(workers, initializer=_init_jsonl_worker,
+                      initargs=(model_cache_path(model_path, coreset), shared_model_dir)) as pool:
+                for output in pool.imap(process, lines):
+                    emit(output)
+        else:
+            for line in lines:
+                emit(process(line, models))
+    finally:
+        if history:
+            history.close()
+        if shadow:
+            shadow.flush()
+            shadow.publish(SUMMARY_PATH)
+
+def main(models=None, history=None):
+    """Interactive prompt for one farm; the bundle is logged to `history` if given"""
     print("\n=== Integrated Sustainable Farming Recommendation System ===\n")
     
     
@@ -551,96 +1001,70 @@ def main():
     salinity_level = input("Enter water salinity level: ").capitalize()
     
     
-    print("\n=== Comprehensive Farm Recommendations ===")
-    
+    record = {
+        'current_crop': current_crop,
+        'prev_crop1': prev_crop1,
+        'prev_crop2': prev_crop2,
+        'prev_crop3': prev_crop3,
+        'soil_type': soil_type,
+        'season': season,
+        'organic_matter': organic_matter,
+        'soil_ph': soil_ph,
+        'current_fertilizer': current_fertilizer,
+        'fertilizer_category': fertilizer_category,
+        'current_pesticide': current_pesticide,
+        'pesticide_category': pesticide_category,
+        'irrigation_type': irrigation_type,
+        'farm_area': farm_area,
+        'temperature': temperature,
+        'rainfall_level': rainfall_level,
+        'water_ph': water_ph,
+        'salinity_level': salinity_level
+    }
     
-    next_crop = get_crop_recommendation(current_crop, 
-                                      [prev_crop1, prev_crop2, prev_crop3],
-                                      season, soil_type)
-    print("\n1. Crop Rotation Recommendation:")
-    print(f"- Recommended next crop: {next_crop}")
+    # Initialize models for command-line usage
+    if models is None:
+        models = load_or_train_models()
+    started = time.perf_counter()
+    bundle = generate_recommendations(record, models)
+    latency_ms = (time.perf_counter() - started) * 1000
     
+    print("\n=== Comprehensive Farm Recommendations ===")
     
-    unique_crops = len(set([current_crop, prev_crop1, prev_crop2, prev_crop3]))
-    rotation_score = (unique_crops / 4) * 100
-    print(f"- Rotation Diversity Score: {rotation_score:.1f}%")
+    print("\n1. Crop Rotation Recommendation:")
+    print(f"- Recommended next crop: {bundle['crop_rotation']['next_crop']}")
+    print(f"- Rotation Diversity Score: {bundle['crop_rotation']['rotation_score']:.1f}%")
     
-   
     print("\n2. Fertilizer Recommendations:")
-    fertilizer_recs = get_fertilizer_recommendation(
-        soil_type, current_crop, organic_matter, soil_ph, 
-        current_fertilizer, fertilizer_category
-    )
-    for rec in fertilizer_recs:
+    for rec in bundle['fertilizer']:
         print(rec)
     
-  
     print("\n3. Pesticide Recommendations:")
-    pesticide_recs = get_pesticide_recommendation(
-        current_pesticide, pesticide_category, current_crop, season
-    )
-    for rec in pesticide_recs:
+    for rec in bundle['pesticide']:
         print(rec)
     
-
     print("\n4. Yield Prediction:")
-    # Initialize models for command-line usage
-    models = initialize_models()
-    
-    # Calculate numerical values
-    rotation_score = calculate_rotation_score(
-        current_crop, prev_crop1, prev_crop2, prev_crop3
-    )
-    
-    water_usage = calculate_water_usage(farm_area, irrigation_type)
-    
-    fertilizer_usage = calculate_fertilizer_usage(farm_area, fertilizer_category)
-    
-    pesticide_usage = calculate_pesticide_usage(farm_area, pesticide_category)
-    
-    # Make yield prediction
-    yield_prediction = predict_yield(
-        current_crop=current_crop,
-        soil_type=soil_type,
-        season=season,
-        organic_matter=organic_matter,
-        soil_ph=soil_ph,
-        fertilizer_category=fertilizer_category,
-        irrigation_type=irrigation_type,
-        farm_area=farm_area,
-        water_usage=water_usage,
-        rotation_score=rotation_score,
-        fertilizer_usage=fertilizer_usage,
-        pesticide_usage=pesticide_usage,
-        temperature=temperature,
-        rainfall_level=rainfall_level,
-        model=models['yield_model'],
-        le_dict=models['yield_le_dict'],
-        scaler=models['yield_scaler']
-    )
-    print(f"- Estimated yield per acre: {yield_prediction['per_acre']} tons")
-    print(f"- Total estimated yield: {yield_prediction['total']} tons")
-    print(f"- Weather impact factor: {yield_prediction['weather_impact']}")
+    print(f"- Estimated yield per acre: {bundle['yield']['per_acre']} tons")
+    print(f"- Total estimated yield: {bundle['yield']['total']} tons")
+    print(f"- Weather impact factor: {bundle['yield']['weather_impact']}")
     print(f"  (Weather impact considers temperature and rainfall conditions)")
     
-    _, weather_recs = assess_weather_impact(current_crop, temperature, rainfall_level)
     print("\nWeather-based Recommendations:")
-    for rec in weather_recs:
+    for rec in bundle['weather']['recommendations']:
         print(rec)
 
-    _, water_quality_recs = assess_water_quality(water_ph, salinity_level)
     print("\nWater Quality Recommendations:")
-    for rec in water_quality_recs:
+    for rec in bundle['water_quality']['recommendations']:
         print(rec)
     
     # 5. Water Management
     print("\n5. Water Management:")
-    water_recs = get_water_management_recommendation(
-        current_crop, season, soil_type, irrigation_type, farm_area
-    )
-    for rec in water_recs:
+    for rec in bundle['water_management']:
         print(rec)
     
+    if history:
+        history.record(record, bundle, latency_ms, 'interactive', model_version(models))
+    
     print("\nAdditional Sustainable Practices:")
     print("1. Use crop residue as organic matter")
     print("2. Implement mulching")
@@ -649,10 +1073,41 @@ def main():
     print("5. Maintain field borders for beneficial insects")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Integrated Sustainable Farming Recommendation System")
+    parser.add_argument('--jsonl', action='store_true',
+                        help="read farm records as JSON lines on stdin and write recommendations as JSON lines on stdout")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of worker processes for --jsonl mode")
+    parser.add_argument('--model-path', default=MODEL_PATH,
+                        help="where trained models are cached")
+    parser.add_argument('--retrain', action='store_true',
+                        help="retrain models even if a cached copy exists")
+    parser.add_argument('--coreset', action='store_true',
+                        help="use forests fitted on a stratified representative subset, "
+                             "saved apart from the full-data models")
+    parser.add_argument('--shared-model-dir',
+                        help="serve --jsonl workers from a memory-mapped copy of the yield model in this directory")
+    parser.add_argument('--history', default=None,
+                        help="append recommendations to this history database "
+                             "(interactive mode defaults to recommendation_history.db)")
+    parser.add_argument('--shadow-model',
+                        help="score --jsonl farms with this candidate model file in shadow mode")
+    args = parser.parse_args()
+
+    if args.jsonl:
+        run_jsonl(model_path=args.model_path, workers=args.workers, retrain=args.retrain,
+                  shared_model_dir=args.shared_model_dir, history_path=args.history,
+                  shadow_model_path=args.shadow_model, coreset=args.coreset)
+        sys.exit(0)
+
+    history = HistoryWriter(args.history or HISTORY_PATH)
     try:
+        models = load_or_train_models(args.model_path, retrain=args.retrain, coreset=args.coreset)
         while True:
-            main()
+            main(models, history)
             if input("\nWould you like another recommendation? (yes/no): ").lower() != 'yes':
                 break
     except KeyboardInterrupt:
-        print("\nThank you for using the recommendation system!")
\ No newline at end of file
+        print("\nThank you for using the recommendation system!")
+    finally:
+        history.close()
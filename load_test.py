@@ -0,0 +1,132 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from dataset import generate_sustainable_farming_dataset
+from integrated_farm_recommendations import (
+    MODEL_PATH,
+    farm_records_from_dataset,
+    generate_recommendations,
+    load_or_train_models
+)
+
+RESULTS_PATH = 'load_test_results.jsonl'
+
+def synthesize_farms(n, seed=None):
+    """Realistic farm records drawn from the dataset generator, plus weather and water readings"""
+    if seed is not None:
+        np.random.seed(seed)
+    farms = farm_records_from_dataset(generate_sustainable_farming_dataset(n))
+    farms['temperature'] = np.random.normal(27, 6, n).round(1)
+    farms['rainfall_level'] = np.random.choice(['Low', 'Moderate', 'High'], n, p=[0.3, 0.5, 0.2])
+    farms['water_ph'] = np.random.normal(7.0, 0.6, n).round(2)
+    farms['salinity_level'] = np.random.choice(['Low', 'Moderate', 'High'], n, p=[0.6, 0.3, 0.1])
+    return farms.to_dict('records')
+
+_worker_models = None
+
+def _init_worker(model_path):
+    global _worker_models
+    with contextlib.redirect_stdout(sys.stderr):
+        _worker_models = load_or_train_models(model_path)
+
+def _timed_request(record, models=None):
+    """Run the full pipeline for one farm; returns (latency seconds, ok)"""
+    models = models if models is not None else _worker_models
+    start = time.perf_counter()
+    try:
+        generate_recommendations(record, models)
+        ok = True
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+def _cpu_seconds():
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return sum(u.ru_utime + u.ru_stime for u in usage)
+
+def run_load_test(farms, mode='thread', concurrency=4, models=None, model_path=MODEL_PATH):
+    """Drive the pipeline with `concurrency` workers and summarize the run.
+
+    Each worker serves one warm-up request before timing starts, so pool
+    start-up and model loading stay out of throughput and latency. Latency
+    is measured around each request inside the worker. CPU utilization
+    covers this process and its pool children as a share of all cores over
+    the wall-clock time; in process mode it includes the workers' model
+    loading, since child CPU time is only reported once they exit.
+    """
+    cpu_start = _cpu_seconds()
+    if mode == 'thread':
+        models = models or load_or_train_models(model_path)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        request = lambda record: _timed_request(record, models)
+    elif mode == 'process':
+        executor = ProcessPoolExecutor(max_workers=concurrency, initializer=_init_worker,
+                                       initargs=(model_path,))
+        request = _timed_request
+    else:
+        raise ValueError(f"Unknown load test mode: {mode}")
+    with executor:
+        list(executor.map(request, farms[:concurrency]))
+        start = time.perf_counter()
+        results = list(executor.map(request, farms))
+        wall = time.perf_counter() - start
+    cpu = _cpu_seconds() - cpu_start
+
+    latencies = np.array([latency for latency, ok in results]) * 1000
+    errors = sum(1 for _, ok in results if not ok)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': platform.node(),
+        'cpu_count': os.cpu_count(),
+        'mode': mode,
+        'concurrency': concurrency,
+        'requests': len(farms),
+        'errors': errors,
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(len(farms) / wall, 2),
+        'latency_mean_ms': round(float(latencies.mean()), 2),
+        'latency_p50_ms': round(float(p50), 2),
+        'latency_p95_ms': round(float(p95), 2),
+        'latency_p99_ms': round(float(p99), 2),
+        'cpu_utilization': round(cpu / (wall * (os.cpu_count() or 1)), 3)
+    }
+
+def append_results(results, path=RESULTS_PATH):
+    """Append run summaries as JSON lines so separate runs can be compared"""
+    with open(path, 'a') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the recommendation pipeline")
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--mode', choices=['thread', 'process'], nargs='+', default=['thread', 'process'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        # Make sure the cached models exist before workers try to load them
+        models = load_or_train_models()
+    farms = synthesize_farms(args.requests, args.seed)
+
+    results = []
+    for mode in args.mode:
+        for concurrency in args.concurrency:
+            result = run_load_test(farms, mode, concurrency, models=models)
+            results.append(result)
+            print(f"{mode:>7} x{concurrency:<3} {result['throughput_rps']:8.1f} req/s  "
+                  f"p50 {result['latency_p50_ms']:7.1f} ms  p95 {result['latency_p95_ms']:7.1f} ms  "
+                  f"p99 {result['latency_p99_ms']:7.1f} ms  cpu {result['cpu_utilization']:.0%}  "
+                  f"errors {result['errors']}")
+    append_results(results, args.output)
+    print(f"\nResults appended to {args.output}")
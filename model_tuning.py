@@ -0,0 +1,149 @@
+import argparse
+import itertools
+import os
+import pickle
+import time
+import pandas as pd
+import numpy as np
+import joblib
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.metrics import mean_squared_error, r2_score
+from integrated_farm_recommendations import (
+    yield_categorical_features,
+    yield_numerical_features
+)
+
+DATA_PATH = 'sustainable_farming_dataset.csv'
+CACHE_DIR = '.tuning_cache'
+
+default_param_grid = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [None, 10, 20],
+    'min_samples_leaf': [1, 2, 5]
+}
+
+memory = joblib.Memory(CACHE_DIR, verbose=0)
+
+@memory.cache
+def _encode_folds(data_path, data_mtime, n_splits, random_state):
+    """Encode the dataset once per fold; cached on disk by dataset path and mtime"""
+    df = pd.read_csv(data_path)
+    features = yield_categorical_features + yield_numerical_features
+
+    # Category codes are global, so fit the label encoders once on the full data
+    encoded = df[features].copy()
+    for col in yield_categorical_features:
+        encoded[col] = LabelEncoder().fit_transform(encoded[col])
+    y = df['Yield(tons)'].to_numpy()
+
+    folds = []
+    kfold = KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for train_idx, test_idx in kfold.split(encoded):
+        X_train = encoded.iloc[train_idx].copy()
+        X_test = encoded.iloc[test_idx].copy()
+        # The scaler only sees the training part of each fold
+        scaler = StandardScaler()
+        X_train[yield_numerical_features] = scaler.fit_transform(X_train[yield_numerical_features])
+        X_test[yield_numerical_features] = scaler.transform(X_test[yield_numerical_features])
+        folds.append((X_train, y[train_idx], X_test, y[test_idx]))
+    return folds
+
+def encode_folds(data_path=DATA_PATH, n_splits=5, random_state=42):
+    """Return cached (X_train, y_train, X_test, y_test) folds for the yield model"""
+    return _encode_folds(data_path, os.path.getmtime(data_path), n_splits, random_state)
+
+def _fit_fold(params, fold_index, fold, keep_model):
+    X_train, y_train, X_test, y_test = fold
+    model = RandomForestRegressor(random_state=42, n_jobs=1, **params)
+    model.fit(X_train, y_train)
+    predictions = model.predict(X_test)
+    return {
+        'params': params,
+        'fold': fold_index,
+        'rmse': float(np.sqrt(mean_squared_error(y_test, predictions))),
+        'r2': float(r2_score(y_test, predictions)),
+        'model': model if keep_model else None
+    }
+
+def measure_latency(model, X, n_calls=200):
+    """Time single-row predictions and return (p50, p99) in milliseconds"""
+    rows = [X.iloc[[i % len(X)]] for i in range(n_calls)]
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+def expand_grid(param_grid):
+    """Turn a dict of lists into a list of parameter dicts"""
+    keys = list(param_grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*param_grid.values())]
+
+def evaluate_candidates(param_grid=None, n_splits=5, n_jobs=-1, latency_calls=200,
+                        data_path=DATA_PATH):
+    """Cross-validate every candidate and measure its latency and size"""
+    candidates = expand_grid(param_grid or default_param_grid)
+    folds = encode_folds(data_path, n_splits)
+
+    # Every (candidate, fold) pair is an independent job, spread across all cores.
+    # Only the first fold's model is sent back, for latency and size measurement.
+    fold_results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(params, i, fold, keep_model=(i == 0))
+        for params in candidates
+        for i, fold in enumerate(folds)
+    )
+
+    # Latency is measured serially so that candidates don't compete for CPU
+    X_probe = folds[0][2]
+    rows = []
+    for params in candidates:
+        scores = [r for r in fold_results if r['params'] == params]
+        model = next(r['model'] for r in scores if r['model'] is not None)
+        p50, p99 = measure_latency(model, X_probe, latency_calls)
+        rows.append({
+            'params': params,
+            'cv_rmse': np.mean([r['rmse'] for r in scores]),
+            'cv_rmse_std': np.std([r['rmse'] for r in scores]),
+            'cv_r2': np.mean([r['r2'] for r in scores]),
+            'latency_p50_ms': p50,
+            'latency_p99_ms': p99,
+            'model_size_mb': len(pickle.dumps(model)) / 1e6
+        })
+    return pd.DataFrame(rows).sort_values('cv_rmse').reset_index(drop=True)
+
+def select_best(results, p99_budget_ms):
+    """Pick the most accurate candidate whose p99 latency fits the budget"""
+    within_budget = results[results['latency_p99_ms'] <= p99_budget_ms]
+    if within_budget.empty:
+        return None
+    return within_budget.sort_values('cv_rmse').iloc[0]
+
+def tune_yield_model(p99_budget_ms=50.0, param_grid=None, n_splits=5, n_jobs=-1):
+    """Run the search and return (best parameters, full results table)"""
+    results = evaluate_candidates(param_grid, n_splits=n_splits, n_jobs=n_jobs)
+    best = select_best(results, p99_budget_ms)
+    if best is None:
+        return None, results
+    params = best['params']
+    return params, results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the yield model")
+    parser.add_argument('--budget-ms', type=float, default=50.0, help="p99 single-row latency budget")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=-1)
+    args = parser.parse_args()
+
+    best_params, results = tune_yield_model(args.budget_ms, n_splits=args.folds, n_jobs=args.jobs)
+    pd.set_option('display.width', 200)
+    pd.set_option('display.max_colwidth', 80)
+    print(results.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    if best_params is None:
+        print(f"\nNo configuration meets the {args.budget_ms} ms p99 budget")
+    else:
+        print(f"\nBest configuration within {args.budget_ms} ms p99: {best_params}")
+        print("Use it with train_yield_prediction_model(model_params=...)")
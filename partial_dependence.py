@@ -0,0 +1,114 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+from integrated_farm_recommendations import (
+    yield_categorical_features,
+    yield_numerical_features,
+    encode_yield_features,
+    load_or_train_models,
+    model_version
+)
+from similar_farms import dataset_version
+
+DATA_PATH = 'sustainable_farming_dataset.csv'
+PDP_DIR = 'pdp_cache'
+
+def _predict_chunks(model, X, n_jobs=None, chunk_size=20000):
+    """model.predict over row chunks on a thread pool; tree traversal releases the GIL"""
+    starts = range(0, len(X), chunk_size)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    predict_chunk = lambda start: model.predict(X.iloc[start:start + chunk_size])
+    if n_jobs == 1 or len(starts) == 1:
+        return np.concatenate([predict_chunk(start) for start in starts])
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        return np.concatenate(list(executor.map(predict_chunk, starts)))
+
+def compute_partial_dependence(models, data, features=None, grid_size=20, n_samples=2000,
+                               ice_samples=50, n_jobs=None, seed=0):
+    """Partial dependence and ICE curves of per-acre yield for numerical features.
+
+    Each feature is swept over a quantile grid (5th to 95th percentile) for
+    a random subsample of n_samples dataset rows, with every other feature
+    left at the row's own value. All features and grid points go through
+    the model as one stacked batch. Predictions are before the weather
+    adjustment. Returns {feature: {'grid', 'average', 'ice'}}, where 'ice'
+    holds ice_samples of the individual curves.
+    """
+    features = features or yield_numerical_features
+    rows = data[yield_categorical_features + yield_numerical_features]
+    if n_samples and len(rows) > n_samples:
+        rows = rows.sample(n_samples, random_state=seed)
+    rows = rows.reset_index(drop=True)
+    n = len(rows)
+
+    grids = {col: np.unique(np.quantile(data[col].to_numpy(dtype=float), np.linspace(0.05, 0.95, grid_size)))
+             for col in features}
+    stacked = []
+    for col in features:
+        sweep = rows.loc[np.tile(np.arange(n), len(grids[col]))].reset_index(drop=True)
+        sweep[col] = np.repeat(grids[col], n)
+        stacked.append(sweep)
+    encoded = encode_yield_features(pd.concat(stacked, ignore_index=True),
+                                    models['yield_le_dict'], models['yield_scaler'])
+    predictions = _predict_chunks(models['yield_model'], encoded, n_jobs)
+
+    curves, offset = {}, 0
+    ice_rows = np.random.default_rng(seed).choice(n, min(ice_samples, n), replace=False)
+    for col in features:
+        size = len(grids[col]) * n
+        ice = predictions[offset:offset + size].reshape(len(grids[col]), n).T
+        offset += size
+        curves[col] = {'grid': grids[col], 'average': ice.mean(axis=0), 'ice': ice[ice_rows]}
+    return curves
+
+def partial_dependence_settings(features=None, grid_size=20, n_samples=2000, ice_samples=50, seed=0):
+    """The settings that determine the curves, with defaults filled in"""
+    return {
+        'features': list(features or yield_numerical_features),
+        'grid_size': grid_size,
+        'n_samples': n_samples,
+        'ice_samples': ice_samples,
+        'seed': seed
+    }
+
+def load_or_compute_partial_dependence(models, data_path=DATA_PATH, cache_dir=PDP_DIR, n_jobs=None, **kwargs):
+    """Curves for this model and dataset, computed once and then read from disk.
+
+    The cache file is keyed by the model fingerprint, the dataset hash and
+    the resolved computation settings, so a retrained model gets fresh
+    curves and every caller asking for the same curves shares one file.
+    n_jobs only changes how fast they are computed, so it is not part of
+    the key.
+    """
+    settings = partial_dependence_settings(**kwargs)
+    key = joblib.hash((model_version(models), dataset_version(data_path), sorted(settings.items())))
+    path = os.path.join(cache_dir, f"{key}.joblib")
+    if os.path.exists(path):
+        return joblib.load(path)
+    curves = compute_partial_dependence(models, pd.read_csv(data_path), n_jobs=n_jobs, **settings)
+    os.makedirs(cache_dir, exist_ok=True)
+    joblib.dump(curves, path)
+    return curves
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute partial dependence and ICE curves for the yield model")
+    parser.add_argument('--samples', type=int, default=2000, help="dataset rows to average over (0 for all)")
+    parser.add_argument('--grid-size', type=int, default=20)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        models = load_or_train_models()
+    start = time.perf_counter()
+    curves = load_or_compute_partial_dependence(models, n_samples=args.samples, grid_size=args.grid_size,
+                                                n_jobs=args.n_jobs)
+    print(f"Curves ready in {time.perf_counter() - start:.2f}s")
+    for col, curve in curves.items():
+        print(f"{col:>28}: yield per acre {curve['average'].min():.1f} to {curve['average'].max():.1f} "
+              f"over {curve['grid'][0]:.2f} to {curve['grid'][-1]:.2f}")
@@ -0,0 +1,267 @@
+import argparse
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+HISTORY_PATH = 'recommendation_history.db'
+
+logger = logging.getLogger(__name__)
+
+# Columns open_history() expects in an existing database
+history_columns = [
+    'id', 'created_at', 'source', 'model_version', 'farm_id', 'crop', 'soil_type', 'season',
+    'irrigation_type', 'next_crop', 'yield_per_acre', 'total_yield', 'latency_ms', 'inputs', 'outputs'
+]
+rollup_columns = [
+    'day', 'crop', 'soil_type', 'season', 'recommendations', 'yield_count', 'yield_sum', 'latency_sum'
+]
+
+def open_history(path=HISTORY_PATH):
+    """Open (and create if needed) the append-only recommendation history.
+
+    A detail table with other columns is refused with ValueError. A rollup
+    table from an older layout is dropped and rebuilt from the details,
+    since it only holds derived totals.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    existing = _table_columns(conn, 'recommendations')
+    if existing and existing != history_columns:
+        conn.close()
+        raise ValueError(f"{path} has an unsupported recommendations table layout: {existing}")
+    stale_rollup = _table_columns(conn, 'recommendation_rollup') not in ([], rollup_columns)
+    if stale_rollup:
+        with conn:
+            conn.execute("DROP TABLE recommendation_rollup")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS recommendations (
+            id INTEGER PRIMARY KEY,
+            created_at REAL NOT NULL,
+            source TEXT,
+            model_version TEXT,
+            farm_id TEXT,
+            crop TEXT,
+            soil_type TEXT,
+            season TEXT,
+            irrigation_type TEXT,
+            next_crop TEXT,
+            yield_per_acre REAL,
+            total_yield REAL,
+            latency_ms REAL,
+            inputs TEXT,
+            outputs TEXT
+        );
+        CREATE INDEX IF NOT EXISTS recommendations_time
+            ON recommendations (created_at);
+        CREATE INDEX IF NOT EXISTS recommendations_crop
+            ON recommendations (crop, created_at);
+        CREATE INDEX IF NOT EXISTS recommendations_region
+            ON recommendations (soil_type, season, created_at);
+        CREATE INDEX IF NOT EXISTS recommendations_farm
+            ON recommendations (farm_id, created_at);
+        CREATE TABLE IF NOT EXISTS recommendation_rollup (
+            day TEXT NOT NULL,
+            crop TEXT,
+            soil_type TEXT,
+            season TEXT,
+            recommendations INTEGER NOT NULL,
+            yield_count INTEGER NOT NULL,
+            yield_sum REAL NOT NULL,
+            latency_sum REAL NOT NULL,
+            PRIMARY KEY (day, crop, soil_type, season)
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS recommendations_no_update BEFORE UPDATE ON recommendations
+            BEGIN SELECT RAISE(ABORT, 'recommendation history is append-only'); END;
+        CREATE TRIGGER IF NOT EXISTS recommendations_no_delete BEFORE DELETE ON recommendations
+            BEGIN SELECT RAISE(ABORT, 'recommendation history is append-only'); END;
+    """)
+    if stale_rollup:
+        rebuild_rollup(conn)
+    return conn
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+# Per day x crop x soil x season totals, kept in step with the detail table;
+# missing keys are stored as '' since primary key columns cannot be NULL
+rollup_upsert = """
+    INSERT INTO recommendation_rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (day, crop, soil_type, season) DO UPDATE SET
+        recommendations = recommendations + excluded.recommendations,
+        yield_count = yield_count + excluded.yield_count,
+        yield_sum = yield_sum + excluded.yield_sum,
+        latency_sum = latency_sum + excluded.latency_sum
+"""
+
+def _history_row(created_at, source, version, record, outputs, latency_ms):
+    yield_prediction = outputs.get('yield') or {}
+    rotation = outputs.get('crop_rotation') or {}
+    return (
+        created_at, source, version,
+        None if record.get('farm_id') is None else str(record['farm_id']),
+        record.get('current_crop'), record.get('soil_type'), record.get('season'),
+        record.get('irrigation_type'), rotation.get('next_crop'),
+        yield_prediction.get('per_acre'), yield_prediction.get('total'),
+        latency_ms,
+        json.dumps(record, default=str), json.dumps(outputs, default=str)
+    )
+
+class HistoryWriter:
+    """Buffers history records and writes them in bulk on a background thread.
+
+    record() only puts a tuple on a bounded queue, so callers never wait on
+    SQLite; JSON encoding and inserts happen on the writer thread, one
+    transaction per batch. If the queue is full the record is counted in
+    `dropped` rather than blocking the request; records of a batch that
+    fails to write are logged and counted in `failed`, and the writer
+    carries on with the next batch.
+    """
+
+    def __init__(self, path=HISTORY_PATH, batch_size=500, flush_interval=1.0, max_queue=100000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        open_history(path).close()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, record, outputs, latency_ms=None, source='cli', version=None):
+        try:
+            self._queue.put_nowait((time.time(), source, version, dict(record), outputs, latency_ms))
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, conn, batch):
+        rows = [_history_row(*item) for item in batch]
+        rollup = {}
+        for row in rows:
+            key = (time.strftime('%Y-%m-%d', time.gmtime(row[0])), row[4] or '', row[5] or '', row[6] or '')
+            count, yield_count, yield_sum, latency_sum = rollup.get(key, (0, 0, 0.0, 0.0))
+            rollup[key] = (count + 1, yield_count + (row[9] is not None),
+                           yield_sum + (row[9] or 0.0), latency_sum + (row[11] or 0.0))
+        with conn:
+            conn.executemany(f"INSERT INTO recommendations (created_at, source, model_version, farm_id, "
+                             f"crop, soil_type, season, irrigation_type, next_crop, yield_per_acre, "
+                             f"total_yield, latency_ms, inputs, outputs) VALUES ({', '.join('?' * 14)})",
+                             rows)
+            conn.executemany(rollup_upsert, [key + totals for key, totals in rollup.items()])
+        self.written += len(rows)
+
+    def _run(self):
+        conn = open_history(self.path)
+        stop = False
+        while not stop:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                if batch:
+                    self._write(conn, batch)
+            except Exception:
+                logger.exception("Failed to write %d history records to %s", len(batch), self.path)
+                self.failed += len(batch)
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """Block until everything recorded so far is on disk"""
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+def _day(timestamp):
+    return None if timestamp is None else time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+def _filters(clauses_values):
+    clauses, params = [], []
+    for clause, value in clauses_values:
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+def _rollup_filters(since, until, crop, soil_type, season):
+    return _filters((("day >= ?", _day(since)), ("day < ?", _day(until)), ("crop = ?", crop),
+                     ("soil_type = ?", soil_type), ("season = ?", season)))
+
+def history_summary(conn, since=None, until=None, crop=None, soil_type=None, season=None):
+    """Count, mean yield and mean latency per crop over whole UTC days.
+
+    Reads the daily rollup, so the cost depends on the number of days and
+    keys in the window, not on the number of recommendations.
+    """
+    where, params = _rollup_filters(since, until, crop, soil_type, season)
+    return pd.read_sql_query(
+        f"SELECT crop, SUM(recommendations) AS recommendations, "
+        f"SUM(yield_sum) / SUM(yield_count) AS mean_yield_per_acre, "
+        f"SUM(latency_sum) / SUM(recommendations) AS mean_latency_ms FROM recommendation_rollup{where} "
+        f"GROUP BY crop ORDER BY recommendations DESC", conn, params=params)
+
+def history_daily(conn, since=None, until=None, crop=None, soil_type=None, season=None):
+    """Recommendations and mean yield per UTC day, from the daily rollup"""
+    where, params = _rollup_filters(since, until, crop, soil_type, season)
+    return pd.read_sql_query(
+        f"SELECT day, SUM(recommendations) AS recommendations, "
+        f"SUM(yield_sum) / SUM(yield_count) AS mean_yield_per_acre FROM recommendation_rollup{where} "
+        f"GROUP BY day ORDER BY day", conn, params=params)
+
+def rebuild_rollup(conn):
+    """Recompute the daily rollup from the detail table, e.g. after a bulk import"""
+    with conn:
+        conn.execute("DELETE FROM recommendation_rollup")
+        conn.execute(
+            "INSERT INTO recommendation_rollup SELECT date(created_at, 'unixepoch'), COALESCE(crop, ''), "
+            "COALESCE(soil_type, ''), COALESCE(season, ''), COUNT(*), COUNT(yield_per_acre), "
+            "TOTAL(yield_per_acre), TOTAL(latency_ms) FROM recommendations "
+            "GROUP BY 1, 2, 3, 4")
+
+def recent_history(conn, limit=100, crop=None, soil_type=None, season=None):
+    """Most recent recommendations, newest first"""
+    where, params = _filters((("crop = ?", crop), ("soil_type = ?", soil_type), ("season = ?", season)))
+    frame = pd.read_sql_query(
+        f"SELECT created_at, source, model_version, farm_id, crop, soil_type, season, irrigation_type, "
+        f"next_crop, yield_per_acre, total_yield, latency_ms FROM recommendations{where} "
+        f"ORDER BY created_at DESC LIMIT ?", conn, params=params + [limit])
+    frame['created_at'] = pd.to_datetime(frame['created_at'], unit='s')
+    return frame
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the recommendation history")
+    parser.add_argument('--history', default=HISTORY_PATH)
+    parser.add_argument('--days', type=float, default=30, help="summarize this many past days")
+    parser.add_argument('--crop')
+    args = parser.parse_args()
+
+    conn = open_history(args.history)
+    start = time.perf_counter()
+    summary = history_summary(conn, since=time.time() - args.days * 86400, crop=args.crop)
+    elapsed = time.perf_counter() - start
+    print(summary.to_string(index=False))
+    print(f"\n{summary['recommendations'].sum()} recommendations in {elapsed * 1000:.0f} ms")
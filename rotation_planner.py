@@ -0,0 +1,119 @@
+import argparse
+import json
+import time
+import pandas as pd
+from integrated_farm_recommendations import (
+    load_or_train_models,
+    predict_yield_batch,
+    calculate_rotation_scores
+)
+from rotation_simulator import season_cycle, successor_table
+
+def _successors(crop):
+    return list(dict.fromkeys(successor_table([crop])[0]))
+
+def _enumerate_states(farm, n_seasons):
+    """List reachable (crop, prev1, prev2, prev3) histories for each future season"""
+    levels = []
+    frontier = {(farm['current_crop'], farm['prev_crop1'], farm['prev_crop2'], farm['prev_crop3'])}
+    for _ in range(n_seasons):
+        frontier = {
+            (nxt, cur, p1, p2)
+            for cur, p1, p2, p3 in frontier
+            for nxt in _successors(cur)
+        }
+        levels.append(sorted(frontier))
+    return levels
+
+def _score_states(farm, levels, models):
+    """Score every state of every frontier with a single batched model call"""
+    seasons = [farm['season']]
+    for _ in levels:
+        seasons.append(season_cycle.get(seasons[-1], seasons[-1]))
+
+    rows = [
+        {**farm, 'current_crop': cur, 'prev_crop1': p1, 'prev_crop2': p2, 'prev_crop3': p3,
+         'season': seasons[t + 1]}
+        for t, states in enumerate(levels)
+        for cur, p1, p2, p3 in states
+    ]
+    candidates = pd.DataFrame(rows)
+    predicted = predict_yield_batch(
+        candidates, models['yield_model'], models['yield_le_dict'], models['yield_scaler']
+    )['per_acre'].to_numpy()
+    rotation = calculate_rotation_scores(
+        candidates['current_crop'], candidates['prev_crop1'],
+        candidates['prev_crop2'], candidates['prev_crop3']
+    )
+
+    scores = {}
+    i = 0
+    for t, states in enumerate(levels):
+        for state in states:
+            scores[(t, state)] = (seasons[t + 1], rotation[i], predicted[i])
+            i += 1
+    return scores
+
+def plan_rotation(farm, models, n_seasons=6, rotation_weight=1.0, yield_weight=1.0):
+    """Find the crop sequence for the next n_seasons with the best combined score.
+
+    Each season contributes rotation_weight * rotation score (0-100) plus
+    yield_weight * predicted yield per acre. Successors come from
+    crop_patterns; the search is an exact dynamic program over crop
+    histories, with every subproblem solved once.
+    """
+    levels = _enumerate_states(farm, n_seasons)
+    scores = _score_states(farm, levels, models)
+    memo = {}
+
+    def best_from(t, state):
+        # Best total objective from season t onwards, given the history at season t
+        key = (t, state)
+        if key in memo:
+            return memo[key]
+        _, rotation, per_acre = scores[key]
+        value = rotation_weight * rotation + yield_weight * per_acre
+        best_next = None
+        if t + 1 < n_seasons:
+            cur, p1, p2, _ = state
+            options = [best_from(t + 1, (nxt, cur, p1, p2)) + ((nxt, cur, p1, p2),)
+                       for nxt in _successors(cur)]
+            best_next = max(options, key=lambda option: option[0])
+            value += best_next[0]
+        memo[key] = (value, best_next[2] if best_next else None)
+        return memo[key]
+
+    cur, p1, p2, p3 = (farm['current_crop'], farm['prev_crop1'], farm['prev_crop2'], farm['prev_crop3'])
+    first_options = [best_from(0, (nxt, cur, p1, p2)) + ((nxt, cur, p1, p2),)
+                     for nxt in _successors(cur)]
+    objective, _, state = max(first_options, key=lambda option: option[0])
+
+    plan = []
+    for t in range(n_seasons):
+        season, rotation, per_acre = scores[(t, state)]
+        plan.append({
+            'season_index': t + 1,
+            'season': season,
+            'crop': state[0],
+            'rotation_score': float(rotation),
+            'yield_per_acre': float(per_acre),
+            'total_yield': round(float(per_acre) * float(farm['farm_area']), 2)
+        })
+        state = memo[(t, state)][1]
+
+    return {'plan': plan, 'objective': float(objective)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimal multi-season crop rotation planner")
+    parser.add_argument('farm', help="farm record as a JSON object (same keys as the --jsonl CLI input)")
+    parser.add_argument('--seasons', type=int, default=6)
+    parser.add_argument('--rotation-weight', type=float, default=1.0)
+    parser.add_argument('--yield-weight', type=float, default=1.0)
+    args = parser.parse_args()
+
+    models = load_or_train_models()
+    start = time.perf_counter()
+    result = plan_rotation(json.loads(args.farm), models, args.seasons,
+                           args.rotation_weight, args.yield_weight)
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    print(json.dumps(result, indent=2))
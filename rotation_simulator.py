@@ -0,0 +1,117 @@
+import argparse
+import time
+import pandas as pd
+import numpy as np
+from integrated_farm_recommendations import (
+    crop_patterns,
+    farm_records_from_dataset,
+    load_or_train_models,
+    predict_yield_batch,
+    calculate_rotation_scores
+)
+
+season_cycle = {'Kharif': 'Rabi', 'Rabi': 'Zaid', 'Zaid': 'Kharif'}
+
+def successor_table(current_crops):
+    """Return an (n, 3) array of candidate next crops for each farm.
+
+    Crops without a rotation pattern keep the same crop in every slot.
+    """
+    crops = np.asarray(current_crops, dtype=object)
+    table = np.repeat(crops[:, None], 3, axis=1)
+    for crop, successors in crop_patterns.items():
+        table[crops == crop] = successors
+    return table
+
+def advance_farms(farms, next_crops):
+    """Roll the crop history forward one season for every farm"""
+    advanced = farms.copy()
+    advanced['prev_crop3'] = farms['prev_crop2'].to_numpy()
+    advanced['prev_crop2'] = farms['prev_crop1'].to_numpy()
+    advanced['prev_crop1'] = farms['current_crop'].to_numpy()
+    advanced['current_crop'] = next_crops
+    advanced['season'] = farms['season'].map(season_cycle).fillna(farms['season']).to_numpy()
+    return advanced
+
+def choose_next_crops(farms, models, rng, policy='random'):
+    """Pick next season's crop for every farm at once.
+
+    'random' matches get_crop_recommendation(), 'first' always takes the
+    first listed successor and 'best_yield' scores all successors in one
+    batched model call and keeps the highest predicted yield.
+    """
+    table = successor_table(farms['current_crop'])
+    n = len(farms)
+    if policy == 'first':
+        return table[:, 0]
+    if policy == 'random':
+        return table[np.arange(n), rng.integers(0, table.shape[1], n)]
+    if policy == 'best_yield':
+        candidates = pd.concat(
+            [advance_farms(farms, table[:, i]) for i in range(table.shape[1])],
+            ignore_index=True
+        )
+        predicted = predict_yield_batch(
+            candidates, models['yield_model'], models['yield_le_dict'], models['yield_scaler']
+        )['per_acre'].to_numpy().reshape(table.shape[1], n)
+        return table[np.arange(n), predicted.argmax(axis=0)]
+    raise ValueError(f"Unknown rotation policy: {policy}")
+
+def simulate_rotations(farms, models, n_seasons=10, policy='random', seed=None):
+    """Project crop rotation, rotation score and yield for many farms.
+
+    Season 0 is the farms' current season. Returns a long-format DataFrame
+    with one row per (farm, season). 'farm' is the farm's position in
+    `farms`, so resampled farms that share a farm_id stay distinct; the
+    farm_id is kept alongside when present.
+    """
+    rng = np.random.default_rng(seed)
+    farms = farms.reset_index(drop=True)
+
+    frames = []
+    for season_index in range(n_seasons):
+        predicted = predict_yield_batch(
+            farms, models['yield_model'], models['yield_le_dict'], models['yield_scaler']
+        )
+        frame = pd.DataFrame({
+            'farm': farms.index.to_numpy(),
+            'season_index': season_index,
+            'season': farms['season'].to_numpy(),
+            'crop': farms['current_crop'].to_numpy(),
+            'rotation_score': calculate_rotation_scores(
+                farms['current_crop'], farms['prev_crop1'], farms['prev_crop2'], farms['prev_crop3']
+            ),
+            'yield_per_acre': predicted['per_acre'].to_numpy(),
+            'total_yield': predicted['total'].to_numpy()
+        })
+        if 'farm_id' in farms:
+            frame.insert(1, 'farm_id', farms['farm_id'].to_numpy())
+        frames.append(frame)
+        if season_index < n_seasons - 1:
+            farms = advance_farms(farms, choose_next_crops(farms, models, rng, policy))
+
+    return pd.concat(frames, ignore_index=True).sort_values(
+        ['farm', 'season_index'], kind='stable'
+    ).reset_index(drop=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-season crop rotation simulator")
+    parser.add_argument('--farms', type=int, default=10000, help="number of farms sampled from the dataset")
+    parser.add_argument('--seasons', type=int, default=10)
+    parser.add_argument('--policy', choices=['random', 'first', 'best_yield'], default='random')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="optional CSV path for the results")
+    args = parser.parse_args()
+
+    models = load_or_train_models()
+    data = pd.read_csv('sustainable_farming_dataset.csv')
+    farms = farm_records_from_dataset(data.sample(args.farms, replace=True, random_state=args.seed))
+
+    start = time.perf_counter()
+    results = simulate_rotations(farms, models, args.seasons, args.policy, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Simulated {args.farms} farms x {args.seasons} seasons in {elapsed:.2f}s")
+    print(results.groupby('season_index')[['rotation_score', 'yield_per_acre', 'total_yield']].mean())
+    if args.output:
+        results.to_csv(args.output, index=False)
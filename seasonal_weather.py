@@ -0,0 +1,164 @@
+import argparse
+import contextlib
+import sys
+import time
+import numpy as np
+import pandas as pd
+from integrated_farm_recommendations import (
+    weather_impact,
+    crop_water_requirements,
+    temperature_yield_impacts,
+    combine_weather_impacts,
+    farm_records_from_dataset,
+    predict_yield_batch,
+    load_or_train_models
+)
+
+# Seasonal rainfall as a share of the crop's water requirement
+rainfall_share_low = 0.5
+rainfall_share_high = 1.5
+default_water_requirement = 600
+default_optimal_range = (20, 30)
+
+# Per-farm running sums kept while readings stream in
+accumulated_columns = ['days', 'temperature_sum', 'temperature_impact', 'optimal_degree_days',
+                       'days_below', 'days_optimal', 'days_above', 'rainfall']
+
+class SeasonalWeather:
+    """Season-long weather impact from daily readings of many farms.
+
+    Readings arrive as DataFrames with farm_id, temperature (daily mean,
+    degrees C) and rainfall_mm columns, in any order and in as many chunks
+    as needed; only per-farm running sums are kept, so memory is bounded by
+    the number of farms rather than the number of readings.
+
+    The factor is the one predict_yield() applies: each day gets the
+    temperature impact of calculate_weather_impact(), the season's average
+    is combined with the impact of its rainfall level, and the result is
+    rounded the same way. A season of constant readings therefore gives
+    exactly the factor of a single prediction at that temperature.
+    Cumulative rainfall is compared with crop_water_requirements for the
+    farm's crop and season to pick the rainfall level.
+
+    For advice, days are also measured against the crop's own optimal range
+    from weather_impact['Temperature']['Optimal']: counted below, within
+    and above it, and summed as optimal degree-days (degrees above the
+    bottom of the range, capped at its top). These do not enter the factor,
+    which has to stay the one used for single predictions.
+    """
+
+    def __init__(self, farms):
+        farms = farms.reset_index(drop=True)
+        self.farm_ids = pd.Index(farms['farm_id'].astype(str))
+        optimal = farms['current_crop'].map(weather_impact['Temperature']['Optimal'])
+        optimal = optimal.where(optimal.notna(), pd.Series([default_optimal_range] * len(farms)))
+        self.optimal_low = np.array([low for low, _ in optimal], dtype=float)
+        self.optimal_high = np.array([high for _, high in optimal], dtype=float)
+        requirement = pd.DataFrame(crop_water_requirements).T.stack()
+        keys = pd.MultiIndex.from_arrays([farms['current_crop'], farms['season']])
+        self.water_requirement = requirement.reindex(keys).fillna(default_water_requirement).to_numpy()
+        self.sums = {col: np.zeros(len(farms)) for col in accumulated_columns}
+        self.unknown_readings = 0
+
+    def update(self, readings):
+        """Add a chunk of daily readings"""
+        codes = self.farm_ids.get_indexer(readings['farm_id'].astype(str))
+        known = codes >= 0
+        self.unknown_readings += int((~known).sum())
+        codes = codes[known]
+        temperature = readings['temperature'].to_numpy(dtype=float)[known]
+        rainfall = readings['rainfall_mm'].to_numpy(dtype=float)[known]
+        low, high = self.optimal_low[codes], self.optimal_high[codes]
+
+        daily = {
+            'days': np.ones(len(codes)),
+            'temperature_sum': temperature,
+            'temperature_impact': temperature_yield_impacts(temperature),
+            'optimal_degree_days': np.clip(temperature, low, high) - low,
+            'days_below': temperature < low,
+            'days_optimal': (temperature >= low) & (temperature <= high),
+            'days_above': temperature > high,
+            'rainfall': rainfall
+        }
+        n = len(self.farm_ids)
+        for col, values in daily.items():
+            self.sums[col] += np.bincount(codes, weights=values, minlength=n)
+
+    def result(self):
+        """Per-farm season summary and weather impact factor"""
+        sums = self.sums
+        days = np.maximum(sums['days'], 1)
+        temperature_impact = sums['temperature_impact'] / days
+        share = sums['rainfall'] / self.water_requirement
+        rainfall_level = np.where(share < rainfall_share_low, 'Low',
+                                  np.where(share > rainfall_share_high, 'High', 'Moderate'))
+        has_readings = sums['days'] > 0
+        return pd.DataFrame({
+            'farm_id': self.farm_ids,
+            'days': sums['days'].astype(int),
+            'mean_temperature': np.where(has_readings, sums['temperature_sum'] / days, np.nan),
+            'optimal_degree_days': sums['optimal_degree_days'],
+            'optimal_day_share': sums['days_optimal'] / days,
+            'days_below_optimal': sums['days_below'].astype(int),
+            'days_above_optimal': sums['days_above'].astype(int),
+            'cumulative_rainfall': sums['rainfall'],
+            'rainfall_level': rainfall_level,
+            'temperature_impact': temperature_impact,
+            # Farms without readings keep a neutral factor
+            'weather_impact': np.where(has_readings, combine_weather_impacts(temperature_impact, rainfall_level), 1.0)
+        })
+
+def seasonal_weather_impacts(readings, farms):
+    """Season summary for readings that already fit in memory"""
+    season = SeasonalWeather(farms)
+    season.update(readings)
+    return season.result()
+
+def stream_seasonal_weather(path, farms, chunksize=1000000):
+    """Season summary from a daily readings CSV read in bounded chunks"""
+    season = SeasonalWeather(farms)
+    for chunk in pd.read_csv(path, chunksize=chunksize,
+                             usecols=['farm_id', 'temperature', 'rainfall_mm'],
+                             dtype={'farm_id': str}):
+        season.update(chunk)
+    return season.result()
+
+def synthesize_daily_weather(farms, days=120, seed=0):
+    """Plausible daily readings for testing: seasonal temperature swing and rain showers"""
+    rng = np.random.default_rng(seed)
+    n = len(farms)
+    base = rng.normal(26, 4, n)[:, None] + 5 * np.sin(np.linspace(0, np.pi, days))[None, :]
+    temperature = base + rng.normal(0, 2, (n, days))
+    rainfall = np.where(rng.random((n, days)) < 0.3, rng.gamma(2.0, 8.0, (n, days)), 0.0)
+    return pd.DataFrame({
+        'farm_id': np.repeat(farms['farm_id'].astype(str).to_numpy(), days),
+        'day': np.tile(np.arange(days), n),
+        'temperature': temperature.ravel().round(1),
+        'rainfall_mm': rainfall.ravel().round(1)
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adjust yield predictions with season-long daily weather")
+    parser.add_argument('--weather', help="CSV of daily readings with farm_id, temperature and rainfall_mm")
+    parser.add_argument('--chunksize', type=int, default=1000000)
+    parser.add_argument('--output', help="optional CSV path for the per-farm results")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        models = load_or_train_models()
+    farms = farm_records_from_dataset(pd.read_csv('sustainable_farming_dataset.csv'))
+
+    start = time.perf_counter()
+    if args.weather:
+        season = stream_seasonal_weather(args.weather, farms, args.chunksize)
+    else:
+        season = seasonal_weather_impacts(synthesize_daily_weather(farms), farms)
+    predictions = predict_yield_batch(farms, models['yield_model'], models['yield_le_dict'],
+                                      models['yield_scaler'], weather_impact=season['weather_impact'])
+    elapsed = time.perf_counter() - start
+
+    results = pd.concat([season, predictions[['per_acre', 'total']].reset_index(drop=True)], axis=1)
+    print(results.head(10).to_string(index=False))
+    print(f"\n{len(results)} farms, {int(season['days'].sum())} daily readings in {elapsed:.2f}s")
+    if args.output:
+        results.to_csv(args.output, index=False)
@@ -0,0 +1,239 @@
+import argparse
+import collections
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import joblib
+import numpy as np
+import pandas as pd
+from integrated_farm_recommendations import (
+    predict_yield_batch,
+    train_yield_prediction_model,
+    farm_records_from_dataset,
+    generate_recommendations,
+    load_or_train_models
+)
+from shared_model import memory_usage
+
+CANDIDATE_PATH = 'candidate_models.joblib'
+SUMMARY_PATH = 'shadow_summary.json'
+
+logger = logging.getLogger(__name__)
+
+_candidate_models = None
+
+def _init_candidate(candidate_path):
+    global _candidate_models
+    # Production always wins the CPU when the two compete
+    os.nice(10)
+    _candidate_models = joblib.load(candidate_path)
+
+def _score_candidate(records, weather_impact):
+    """Candidate per-acre predictions for a batch, run in the shadow process.
+
+    The production weather factors are reused, so the deltas only reflect
+    the models.
+    """
+    start = time.perf_counter()
+    models = _candidate_models
+    per_acre = predict_yield_batch(pd.DataFrame(records), models['yield_model'], models['yield_le_dict'],
+                                   models['yield_scaler'], weather_impact=weather_impact)['per_acre'].to_numpy()
+    return per_acre, (time.perf_counter() - start) * 1000, memory_usage().get('rss_mb')
+
+class ShadowEvaluator:
+    """Scores a candidate yield model on live inputs off the request path.
+
+    submit() only enqueues the farm record, the production per-acre
+    prediction and the weather factor it was adjusted with. A collector thread gathers them into batches and hands each
+    batch to a dedicated process that holds the candidate, so the candidate
+    neither shares the GIL nor the memory of the serving process. That
+    process is spawned rather than forked, since the serving process (e.g.
+    the Streamlit server) is multithreaded. A full queue drops the sample
+    instead of blocking; the production response never waits on the
+    candidate. A batch that fails to score is logged and its samples are
+    counted in `errors`; the collector keeps going, restarting the
+    candidate process if it died.
+    """
+
+    def __init__(self, candidate_path=CANDIDATE_PATH, batch_size=256, linger=0.5, max_queue=10000,
+                 window=100000, summary_path=None, publish_interval=10.0):
+        self.candidate_path = candidate_path
+        self.batch_size = batch_size
+        self.linger = linger
+        self.summary_path = summary_path
+        self.publish_interval = publish_interval
+        self._executor = self._start_candidate()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._deltas = collections.deque(maxlen=window)
+        self._latencies = collections.deque(maxlen=window)
+        self.count = 0
+        self.dropped = 0
+        self.errors = 0
+        self.publish_errors = 0
+        self.candidate_rss_mb = None
+        self._delta_sum = 0.0
+        self._abs_delta_sum = 0.0
+        self._production_sum = 0.0
+        self._last_publish = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+        self._thread.start()
+
+    def _start_candidate(self):
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_candidate, initargs=(self.candidate_path,))
+        # Start the process and load the candidate now rather than on the first batch
+        executor.submit(int)
+        return executor
+
+    def submit(self, record, production_per_acre, weather_impact):
+        try:
+            self._queue.put_nowait((dict(record), float(production_per_acre), float(weather_impact)))
+        except queue.Full:
+            self.dropped += 1
+
+    def _score(self, batch):
+        production = np.array([value for _, value, _ in batch])
+        candidate, elapsed_ms, rss_mb = self._executor.submit(
+            _score_candidate, [record for record, _, _ in batch], [weather for _, _, weather in batch]).result()
+        deltas = candidate - production
+        with self._lock:
+            self.count += len(batch)
+            self._deltas.extend(deltas)
+            self._latencies.append(elapsed_ms / len(batch))
+            self.candidate_rss_mb = rss_mb
+            self._delta_sum += float(deltas.sum())
+            self._abs_delta_sum += float(np.abs(deltas).sum())
+            self._production_sum += float(production.sum())
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Linger briefly so the candidate scores whole batches
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0.001)))
+                except queue.Empty:
+                    break
+            try:
+                self._score(batch)
+            except Exception as e:
+                logger.exception("Shadow scoring failed for %d samples", len(batch))
+                with self._lock:
+                    self.errors += len(batch)
+                if isinstance(e, BrokenProcessPool):
+                    self._executor = self._start_candidate()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if self.summary_path and time.monotonic() - self._last_publish >= self.publish_interval:
+                try:
+                    self.publish(self.summary_path)
+                except Exception:
+                    logger.exception("Failed to publish the shadow summary to %s", self.summary_path)
+                    with self._lock:
+                        self.publish_errors += 1
+
+    def flush(self):
+        """Block until every submitted sample has been scored"""
+        self._queue.join()
+
+    def snapshot(self):
+        """Summary of candidate vs production over everything scored so far"""
+        with self._lock:
+            deltas = np.array(self._deltas)
+            latencies = np.array(self._latencies)
+            count = self.count
+            summary = {
+                'scored': count,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'publish_errors': self.publish_errors,
+                'pending': self._queue.qsize(),
+                'candidate_rss_mb': None if self.candidate_rss_mb is None else round(self.candidate_rss_mb, 1)
+            }
+            if count:
+                summary.update({
+                    'mean_delta': round(self._delta_sum / count, 3),
+                    'mean_abs_delta': round(self._abs_delta_sum / count, 3),
+                    'relative_abs_delta': round(self._abs_delta_sum / max(self._production_sum, 1e-9), 4)
+                })
+        if len(deltas):
+            abs_p50, abs_p95, abs_max = np.percentile(np.abs(deltas), [50, 95, 100])
+            summary.update({
+                'abs_delta_p50': round(float(abs_p50), 3),
+                'abs_delta_p95': round(float(abs_p95), 3),
+                'abs_delta_max': round(float(abs_max), 3)
+            })
+        if len(latencies):
+            p50, p99 = np.percentile(latencies, [50, 99])
+            summary.update({
+                'candidate_ms_per_farm_p50': round(float(p50), 3),
+                'candidate_ms_per_farm_p99': round(float(p99), 3)
+            })
+        return summary
+
+    def publish(self, path=SUMMARY_PATH):
+        """Write the current summary as JSON for dashboards and reviews"""
+        self._last_publish = time.monotonic()
+        with open(path, 'w') as f:
+            json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), **self.snapshot()}, f, indent=2)
+
+def load_shadow_evaluator(candidate_path=CANDIDATE_PATH, **kwargs):
+    """ShadowEvaluator for a saved candidate, or None if there is no candidate"""
+    if not os.path.exists(candidate_path):
+        return None
+    return ShadowEvaluator(candidate_path, **kwargs)
+
+def train_candidate(model_params, candidate_path=CANDIDATE_PATH):
+    """Train a candidate yield model with different parameters and save it"""
+    model, le_dict, scaler = train_yield_prediction_model(model_params)
+    models = {'yield_model': model, 'yield_le_dict': le_dict, 'yield_scaler': scaler}
+    joblib.dump(models, candidate_path)
+    return models
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay farms through production with a shadow candidate model")
+    parser.add_argument('--candidate', default=CANDIDATE_PATH)
+    parser.add_argument('--train', metavar='PARAMS_JSON',
+                        help="train and save a candidate first, e.g. '{\"n_estimators\": 200}'")
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        models = load_or_train_models()
+        if args.train:
+            train_candidate(json.loads(args.train), args.candidate)
+    shadow = load_shadow_evaluator(args.candidate, summary_path=SUMMARY_PATH)
+    if shadow is None:
+        sys.exit(f"No candidate model at {args.candidate}; use --train to create one")
+
+    records = farm_records_from_dataset(pd.read_csv('sustainable_farming_dataset.csv')
+                                        .sample(args.requests, replace=True, random_state=0)).to_dict('records')
+
+    def replay(submit):
+        latencies = []
+        for record in records:
+            start = time.perf_counter()
+            bundle = generate_recommendations(record, models)
+            latencies.append(time.perf_counter() - start)
+            submit(record, bundle['yield']['per_acre'], bundle['yield']['weather_impact'])
+        return np.percentile(np.array(latencies) * 1000, [50, 99])
+
+    baseline = replay(lambda record, per_acre, weather_impact: None)
+    with_shadow = replay(shadow.submit)
+    shadow.flush()
+    shadow.publish(SUMMARY_PATH)
+
+    print(f"Production latency without shadow: p50 {baseline[0]:.1f} ms, p99 {baseline[1]:.1f} ms")
+    print(f"Production latency with shadow:    p50 {with_shadow[0]:.1f} ms, p99 {with_shadow[1]:.1f} ms")
+    print(json.dumps(shadow.snapshot(), indent=2))
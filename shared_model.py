@@ -0,0 +1,163 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import pandas as pd
+import numpy as np
+import joblib
+from integrated_farm_recommendations import (
+    MODEL_PATH,
+    farm_records_from_dataset,
+    load_or_train_models,
+    model_version,
+    predict_yield_batch
+)
+
+SHARED_MODEL_DIR = 'shared_yield_model'
+
+# Node arrays written one file each so they can be memory-mapped
+node_arrays = ['feature', 'threshold', 'left', 'right', 'value']
+
+class FlatForest:
+    """Regression forest evaluated from flattened node arrays.
+
+    The arrays are memory-mapped read-only, so every process that loads the
+    same directory shares one physical copy through the page cache. Only
+    predict() is supported; explanations and intervals need the original
+    sklearn model.
+    """
+
+    def __init__(self, arrays, roots, max_depth, n_features):
+        self.arrays = arrays
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+
+    def predict(self, X):
+        # sklearn compares float32 inputs against its thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        feature = self.arrays['feature']
+        threshold = self.arrays['threshold']
+        left = self.arrays['left']
+        right = self.arrays['right']
+
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        # Leaves point at themselves, so every row can take max_depth steps
+        for _ in range(self.max_depth):
+            go_left = X[rows, feature[nodes]] <= threshold[nodes]
+            nodes = np.where(go_left, left[nodes], right[nodes])
+        return self.arrays['value'][nodes].mean(axis=1)
+
+def export_flat_forest(model, directory=SHARED_MODEL_DIR, version=None):
+    """Write the forest's trees as concatenated node arrays, tagged with `version`"""
+    os.makedirs(directory, exist_ok=True)
+    parts = {name: [] for name in node_arrays}
+    roots = []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left < 0
+        parts['feature'].append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        parts['threshold'].append(np.where(leaf, np.inf, tree.threshold))
+        parts['left'].append(np.where(leaf, nodes, tree.children_left) + offset)
+        parts['right'].append(np.where(leaf, nodes, tree.children_right) + offset)
+        parts['value'].append(tree.value[:, 0, 0])
+        roots.append(offset)
+        offset += tree.node_count
+
+    for name, values in parts.items():
+        np.save(os.path.join(directory, f'{name}.npy'), np.concatenate(values))
+    np.save(os.path.join(directory, 'roots.npy'), np.array(roots, dtype=np.int64))
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump({
+            'max_depth': int(max(e.tree_.max_depth for e in model.estimators_)),
+            'n_features': int(model.n_features_in_),
+            'n_nodes': int(offset),
+            'model_version': version
+        }, f)
+
+def load_flat_forest(directory=SHARED_MODEL_DIR):
+    """Memory-map an exported forest; takes milliseconds regardless of size"""
+    with open(os.path.join(directory, 'meta.json')) as f:
+        meta = json.load(f)
+    arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+              for name in node_arrays}
+    roots = np.load(os.path.join(directory, 'roots.npy'))
+    return FlatForest(arrays, roots, meta['max_depth'], meta['n_features'])
+
+def export_shared_models(models, directory=SHARED_MODEL_DIR):
+    """Export the yield forest plus its small encoders for shared serving"""
+    export_flat_forest(models['yield_model'], directory, model_version(models))
+    joblib.dump({'yield_le_dict': models['yield_le_dict'], 'yield_scaler': models['yield_scaler']},
+                os.path.join(directory, 'encoders.joblib'))
+
+def shared_model_version(directory=SHARED_MODEL_DIR):
+    """model_version() of the exported models, or None if there is no export"""
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            return json.load(f).get('model_version')
+    except OSError:
+        return None
+
+def load_shared_models(directory=SHARED_MODEL_DIR):
+    """Models dict compatible with predict_yield(), backed by the mmapped forest"""
+    models = joblib.load(os.path.join(directory, 'encoders.joblib'))
+    models['yield_model'] = load_flat_forest(directory)
+    return models
+
+def memory_usage():
+    """Resident and proportional set size of this process in MB (Linux)"""
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Private_Dirty'):
+                    usage[key.lower() + '_mb'] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        usage['rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return usage
+
+def _worker(mode, farms):
+    """Load the model in a fresh worker and report memory before and after"""
+    before = memory_usage()
+    start = time.perf_counter()
+    if mode == 'shared':
+        models = load_shared_models()
+    else:
+        models = joblib.load(MODEL_PATH)
+    load_seconds = time.perf_counter() - start
+    predict_yield_batch(farms, models['yield_model'], models['yield_le_dict'], models['yield_scaler'])
+    after = memory_usage()
+    return {'pid': os.getpid(), 'mode': mode, 'load_ms': load_seconds * 1000,
+            **{f'before_{k}': v for k, v in before.items()},
+            **{f'after_{k}': v for k, v in after.items()}}
+
+def compare_worker_memory(n_workers=4, n_farms=1000):
+    """Start a pre-fork pool per mode and collect per-worker memory reports"""
+    data = pd.read_csv('sustainable_farming_dataset.csv')
+    farms = farm_records_from_dataset(data.sample(n_farms, replace=True, random_state=0))
+    context = multiprocessing.get_context('fork')
+    reports = []
+    for mode in ('pickled', 'shared'):
+        with context.Pool(n_workers, maxtasksperchild=1) as pool:
+            reports += pool.starmap(_worker, [(mode, farms)] * n_workers)
+    return pd.DataFrame(reports)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export and benchmark the memory-mapped yield model")
+    parser.add_argument('command', choices=['export', 'compare'])
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    models = load_or_train_models()
+    if args.command == 'export' or shared_model_version() != model_version(models):
+        export_shared_models(models)
+        print(f"Exported yield model to {SHARED_MODEL_DIR}/")
+    if args.command == 'compare':
+        pd.set_option('display.width', 200)
+        print(compare_worker_memory(args.workers).round(1).to_string(index=False))
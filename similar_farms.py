@@ -0,0 +1,147 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+import numpy as np
+import joblib
+from sklearn.neighbors import KDTree
+from integrated_farm_recommendations import (
+    yield_numerical_features,
+    calculate_rotation_scores,
+    load_or_train_models
+)
+
+DATA_PATH = 'sustainable_farming_dataset.csv'
+INDEX_PATH = 'similar_farms_index.joblib'
+# Bumped when the indexed points change, so persisted indexes are rebuilt
+INDEX_FORMAT = 2
+
+# Scaled yield model features used for similarity. The usage columns are
+# left out because calculate_water_usage() and friends estimate them on a
+# different scale from the recorded values in the dataset. For the same
+# reason the rotation score is computed with calculate_rotation_scores()
+# for dataset rows and queries alike, never read from the dataset.
+similarity_features = [
+    'Organic_Matter_Content(%)',
+    'Soil_pH',
+    'Rotation_Health_Score'
+]
+similarity_columns = [yield_numerical_features.index(col) for col in similarity_features]
+
+outcome_columns = [
+    'Farm_ID',
+    'Current_Crop',
+    'Soil_Type',
+    'Season',
+    'Farm_Area(acres)',
+    'Irrigation_Type',
+    'Yield(tons)',
+    'Rotation_Health_Score',
+    'Sustainability_Score'
+]
+
+def dataset_version(data_path=DATA_PATH):
+    """Content hash of the dataset, used to invalidate a persisted index"""
+    digest = hashlib.sha1()
+    with open(data_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _similarity_points(scaler, organic_matter, soil_ph, rotation_score):
+    # Standardize just the similarity columns with the yield scaler's statistics;
+    # plain NumPy keeps a single query free of DataFrame and validation overhead
+    values = np.column_stack([np.asarray(organic_matter, dtype=float), np.asarray(soil_ph, dtype=float),
+                              np.asarray(rotation_score, dtype=float)])
+    return (values - scaler.mean_[similarity_columns]) / scaler.scale_[similarity_columns]
+
+def build_similar_farm_index(scaler, data_path=DATA_PATH, leaf_size=40):
+    """Build KD-trees over scaled soil and rotation features, one per crop/soil/season"""
+    data = pd.read_csv(data_path)
+    rotation_score = calculate_rotation_scores(data['Current_Crop'], data['Previous_Crop_1'],
+                                               data['Previous_Crop_2'], data['Previous_Crop_3'])
+    points = _similarity_points(scaler, data['Organic_Matter_Content(%)'], data['Soil_pH'], rotation_score)
+
+    partitions = {}
+    for key, rows in data.groupby(['Current_Crop', 'Soil_Type', 'Season']).indices.items():
+        partitions[key] = (KDTree(points[rows], leaf_size=leaf_size), rows)
+
+    return {
+        'version': dataset_version(data_path),
+        'format': INDEX_FORMAT,
+        'scaler': scaler,
+        'partitions': partitions,
+        # Fallback for unseen or very small partitions
+        'global': KDTree(points, leaf_size=leaf_size),
+        'outcomes': data[outcome_columns].reset_index(drop=True)
+    }
+
+def load_or_build_similar_farm_index(scaler, data_path=DATA_PATH, index_path=INDEX_PATH):
+    """Load the persisted index, rebuilding it when the dataset or index format has changed"""
+    version = dataset_version(data_path)
+    if os.path.exists(index_path):
+        index = joblib.load(index_path)
+        if index['version'] == version and index.get('format') == INDEX_FORMAT:
+            return index
+    index = build_similar_farm_index(scaler, data_path)
+    joblib.dump(index, index_path)
+    return index
+
+def _query_points(index, farms):
+    rotation_score = calculate_rotation_scores(farms['current_crop'], farms['prev_crop1'],
+                                               farms['prev_crop2'], farms['prev_crop3'])
+    return _similarity_points(index['scaler'], farms['organic_matter'], farms['soil_ph'], rotation_score)
+
+def _query_partition(index, key, points, k):
+    tree, rows = index['partitions'].get(key, (None, None))
+    if tree is None or len(rows) < k:
+        distances, neighbours = index['global'].query(points, k=k)
+        return distances, neighbours
+    distances, neighbours = tree.query(points, k=k)
+    return distances, rows[neighbours]
+
+def find_similar_farms(index, farm, k=5):
+    """Return the k most similar dataset farms and their outcomes for one farm record"""
+    key = (farm['current_crop'], farm['soil_type'], farm['season'])
+    # A record's fields go straight in as length-1 lists, no DataFrame needed
+    farms = {col: [farm[col]] for col in ('current_crop', 'prev_crop1', 'prev_crop2', 'prev_crop3',
+                                          'organic_matter', 'soil_ph')}
+    distances, neighbours = _query_partition(index, key, _query_points(index, farms), k)
+    similar = index['outcomes'].iloc[neighbours[0]].reset_index(drop=True)
+    similar.insert(0, 'distance', distances[0])
+    return similar
+
+def find_similar_farms_batch(index, farms, k=5):
+    """Query many farm records at once; one tree query per partition.
+
+    Returns a long DataFrame with a 'query' column holding the position
+    of each input farm.
+    """
+    farms = farms.reset_index(drop=True)
+    points = _query_points(index, farms)
+    frames = []
+    for key, positions in farms.groupby(['current_crop', 'soil_type', 'season']).indices.items():
+        distances, neighbours = _query_partition(index, key, points[positions], k)
+        similar = index['outcomes'].iloc[neighbours.ravel()].reset_index(drop=True)
+        similar.insert(0, 'distance', distances.ravel())
+        similar.insert(0, 'query', np.repeat(positions, k))
+        frames.append(similar)
+    return pd.concat(frames, ignore_index=True).sort_values(
+        ['query', 'distance'], kind='stable'
+    ).reset_index(drop=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the most similar farms in the dataset")
+    parser.add_argument('farm', help="farm record as a JSON object (same keys as the --jsonl CLI input)")
+    parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args()
+
+    models = load_or_train_models()
+    index = load_or_build_similar_farm_index(models['yield_scaler'])
+    start = time.perf_counter()
+    similar = find_similar_farms(index, json.loads(args.farm), args.k)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(similar.to_string(index=False))
+    print(f"\nQuery time: {elapsed:.2f} ms")
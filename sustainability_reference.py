@@ -0,0 +1,126 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+DATA_PATH = 'sustainable_farming_dataset.csv'
+REFERENCE_PATH = 'sustainability_reference.npz'
+
+# Weights of the Sustainability_Score formula in dataset.py; lower usage is better
+sustainability_weights = {
+    'Water_Usage(cubic meters)': 30,
+    'Fertilizer_Used(tons)': 30,
+    'Pesticide_Used(kg)': 40
+}
+
+class SustainabilityReference:
+    """Sorted reference distributions for scoring new farms in O(log n).
+
+    A new farm gets the Sustainability_Score it would have if it were
+    appended to the reference data and the dataset.py formula were re-run:
+    pandas' average-rank percentile becomes (below + (ties + 2) / 2) / (n + 1),
+    where below and ties come from two binary searches per metric.
+
+    New observations go to a small sorted buffer that is searched alongside
+    the main arrays and merged into them once it grows past merge_size.
+    """
+
+    def __init__(self, sorted_values, merge_size=10000):
+        self.sorted_values = {col: np.asarray(values, dtype=float) for col, values in sorted_values.items()}
+        self.buffer = {col: np.empty(0) for col in sustainability_weights}
+        self.merge_size = merge_size
+
+    @classmethod
+    def from_frame(cls, data, **kwargs):
+        return cls({col: np.sort(data[col].to_numpy(dtype=float)) for col in sustainability_weights}, **kwargs)
+
+    def __len__(self):
+        col = next(iter(sustainability_weights))
+        return len(self.sorted_values[col]) + len(self.buffer[col])
+
+    def _count(self, col, values):
+        # Number of reference values strictly below, and equal to, each value
+        below = np.zeros(len(values), dtype=np.int64)
+        ties = np.zeros(len(values), dtype=np.int64)
+        for reference in (self.sorted_values[col], self.buffer[col]):
+            left = np.searchsorted(reference, values, side='left')
+            right = np.searchsorted(reference, values, side='right')
+            below += left
+            ties += right - left
+        return below, ties
+
+    def score(self, water_usage, fertilizer_used, pesticide_used):
+        """Sustainability_Score of one or many new farms against the reference"""
+        inputs = {
+            'Water_Usage(cubic meters)': water_usage,
+            'Fertilizer_Used(tons)': fertilizer_used,
+            'Pesticide_Used(kg)': pesticide_used
+        }
+        scalar = np.ndim(water_usage) == 0
+        n = len(self)
+        total = 0.0
+        for col, weight in sustainability_weights.items():
+            values = np.atleast_1d(np.asarray(inputs[col], dtype=float))
+            below, ties = self._count(col, values)
+            percentile = (below + (ties + 2) / 2) / (n + 1)
+            total = total + (1 - percentile) * weight
+        return float(total[0]) if scalar else total
+
+    def score_frame(self, data):
+        """Score every row of a DataFrame with the dataset's usage columns"""
+        return self.score(*(data[col].to_numpy(dtype=float) for col in sustainability_weights))
+
+    def append(self, water_usage, fertilizer_used, pesticide_used):
+        """Add new observations to the reference without a full rebuild"""
+        inputs = {
+            'Water_Usage(cubic meters)': water_usage,
+            'Fertilizer_Used(tons)': fertilizer_used,
+            'Pesticide_Used(kg)': pesticide_used
+        }
+        for col in sustainability_weights:
+            values = np.atleast_1d(np.asarray(inputs[col], dtype=float))
+            buffer = np.concatenate([self.buffer[col], values])
+            buffer.sort()
+            self.buffer[col] = buffer
+        if len(self.buffer[next(iter(sustainability_weights))]) >= self.merge_size:
+            self.merge()
+
+    def merge(self):
+        """Fold the buffer into the main sorted arrays"""
+        for col in sustainability_weights:
+            merged = np.concatenate([self.sorted_values[col], self.buffer[col]])
+            merged.sort(kind='mergesort')
+            self.sorted_values[col] = merged
+            self.buffer[col] = np.empty(0)
+
+    def save(self, path=REFERENCE_PATH):
+        self.merge()
+        np.savez(path, **{f'col{i}': self.sorted_values[col]
+                          for i, col in enumerate(sustainability_weights)})
+
+    @classmethod
+    def load(cls, path=REFERENCE_PATH, **kwargs):
+        with np.load(path) as stored:
+            return cls({col: stored[f'col{i}'] for i, col in enumerate(sustainability_weights)}, **kwargs)
+
+def build_sustainability_reference(data_path=DATA_PATH, reference_path=REFERENCE_PATH):
+    """Build the reference from the dataset and persist it"""
+    reference = SustainabilityReference.from_frame(pd.read_csv(data_path))
+    reference.save(reference_path)
+    return reference
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score new farms against the dataset's Sustainability_Score")
+    parser.add_argument('--water', type=float, required=True, help="water usage (cubic meters)")
+    parser.add_argument('--fertilizer', type=float, required=True, help="fertilizer used (tons)")
+    parser.add_argument('--pesticide', type=float, required=True, help="pesticide used (kg)")
+    parser.add_argument('--rebuild', action='store_true', help="rebuild the reference from the dataset")
+    args = parser.parse_args()
+
+    try:
+        if args.rebuild:
+            raise FileNotFoundError
+        reference = SustainabilityReference.load()
+    except FileNotFoundError:
+        reference = build_sustainability_reference()
+    score = reference.score(args.water, args.fertilizer, args.pesticide)
+    print(f"Sustainability score: {score:.2f} (reference of {len(reference)} farms)")
@@ -0,0 +1,19 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The modules read the dataset and model cache by relative path
+os.chdir(ROOT)
+
+@pytest.fixture(scope='session')
+def models():
+    from integrated_farm_recommendations import load_or_train_models
+    return load_or_train_models()
+
+@pytest.fixture(scope='session')
+def farms():
+    import pandas as pd
+    from integrated_farm_recommendations import farm_records_from_dataset
+    return farm_records_from_dataset(pd.read_csv('sustainable_farming_dataset.csv').head(200))
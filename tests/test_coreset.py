@@ -0,0 +1,48 @@
+import os
+import shutil
+import joblib
+import numpy as np
+from dataset import generate_sustainable_farming_dataset
+from integrated_farm_recommendations import (
+    MODEL_PATH,
+    coreset_strata,
+    load_or_train_models,
+    model_cache_path,
+    stratified_coreset
+)
+
+def test_coreset_covers_every_stratum():
+    np.random.seed(0)
+    data = generate_sustainable_farming_dataset(20000)
+    rows = stratified_coreset(data)
+    assert (np.diff(rows) > 0).all()
+
+    counts = data.groupby(coreset_strata).size()
+    kept = data.iloc[rows].groupby(coreset_strata).size().reindex(counts.index, fill_value=0)
+    assert (kept >= np.minimum(counts, 5)).all()
+    target = max(int(20 * np.sqrt(len(data))), len(counts) * 5)
+    assert abs(len(rows) - target) <= len(counts)
+
+def test_coreset_size_is_respected():
+    np.random.seed(1)
+    data = generate_sustainable_farming_dataset(50000)
+    n_strata = data.groupby(coreset_strata).ngroups
+    size = n_strata * 20
+    assert abs(len(stratified_coreset(data, size)) - size) <= n_strata
+
+def test_coreset_models_do_not_replace_full_models(tmp_path):
+    model_path = str(tmp_path / 'farm_models.joblib')
+    load_or_train_models()
+    shutil.copy(MODEL_PATH, model_path)
+    before = os.path.getmtime(model_path)
+
+    coreset_models = load_or_train_models(model_path, coreset=True)
+    assert coreset_models['training_mode'] == 'coreset'
+    assert os.path.exists(model_cache_path(model_path, True))
+    assert os.path.getmtime(model_path) == before
+    assert load_or_train_models(model_path).get('training_mode', 'full') == 'full'
+
+def test_mismatched_bundle_is_retrained(models, tmp_path):
+    model_path = str(tmp_path / 'farm_models.joblib')
+    joblib.dump({**models, 'training_mode': 'coreset'}, model_path)
+    assert load_or_train_models(model_path)['training_mode'] == 'full'
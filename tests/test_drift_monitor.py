@@ -0,0 +1,9 @@
+import pandas as pd
+from drift_monitor import DriftMonitor
+from integrated_farm_recommendations import farm_records_from_dataset
+
+def test_training_farms_show_no_drift():
+    monitor = DriftMonitor()
+    data = pd.read_csv('sustainable_farming_dataset.csv').sample(1000, random_state=1)
+    monitor.update(farm_records_from_dataset(data))
+    assert (monitor.snapshot_frame()['status'] == 'ok').all()
@@ -0,0 +1,18 @@
+import os
+from farm_reports import generate_reports, report_filenames
+from integrated_farm_recommendations import generate_recommendations
+
+def test_filenames_stay_inside_and_do_not_collide():
+    names = report_filenames([{'farm_id': '../../etc/passwd'}, {'farm_id': 'a/b'}, {'farm_id': 'F1'},
+                              {'farm_id': 'F1'}, {'farm_id': 'f1'}, {'farm_id': '..'}, {}])
+    assert len(set(names)) == len(names)
+    assert all(os.path.basename(name) == name and not name.startswith('.') for name in names)
+    assert names[2:5] == ['F1.html', 'F1-2.html', 'f1-3.html']
+
+def test_every_report_is_written(models, farms, tmp_path):
+    record = farms.to_dict('records')[0]
+    bundle = generate_recommendations(record, models)
+    scored = [({**record, 'farm_id': farm_id}, bundle) for farm_id in ['F1', 'F1', '../F1', 'x/../../y']]
+    written, _ = generate_reports(scored, tmp_path / 'reports', workers=1)
+    assert written == len(os.listdir(tmp_path / 'reports')) == 4
+    assert os.listdir(tmp_path) == ['reports']
@@ -0,0 +1,50 @@
+import copy
+import numpy as np
+import pytest
+from integrated_farm_recommendations import predict_yield_batch
+from feature_store import fetch_farms, open_store, predict_by_id, reencode_store, update_farm, upsert_farms
+
+def _batch(farms, models):
+    return predict_yield_batch(farms, models['yield_model'], models['yield_le_dict'], models['yield_scaler'])
+
+@pytest.fixture
+def store(models, farms, tmp_path):
+    conn = open_store(str(tmp_path / 'features.db'))
+    upsert_farms(conn, farms, models, chunk_size=64)
+    yield conn
+    conn.close()
+
+def test_round_trip_matches_batch_predict(store, models, farms):
+    ids = list(farms['farm_id'].astype(str))
+    predictions = predict_by_id(store, ids[::-1], models)
+    expected = _batch(farms, models).iloc[::-1]
+    assert list(predictions['farm_id']) == ids[::-1]
+    np.testing.assert_array_equal(predictions['per_acre'], expected['per_acre'])
+    np.testing.assert_array_equal(predictions['total'], expected['total'])
+
+def test_missing_ids_are_dropped(store, models, farms):
+    first = str(farms['farm_id'].iloc[0])
+    assert list(fetch_farms(store, ['no-such-farm', first])['farm_id']) == [first]
+
+def test_partial_update(store, models, farms):
+    farm_id = str(farms['farm_id'].iloc[5])
+    update_farm(store, farm_id, models, soil_ph=5.1, irrigation_type='Drip', temperature=33.0)
+    changed = farms.iloc[[5]].assign(soil_ph=5.1, irrigation_type='Drip', temperature=33.0)
+    prediction = predict_by_id(store, [farm_id], models)
+    assert prediction['per_acre'].iloc[0] == _batch(changed, models)['per_acre'].iloc[0]
+
+    with pytest.raises(ValueError):
+        update_farm(store, farm_id, models, colour='red')
+    with pytest.raises(KeyError):
+        update_farm(store, 'no-such-farm', models, soil_ph=6.0)
+
+def test_new_encoders_need_reencode(store, models, farms):
+    retrained = copy.deepcopy(models)
+    retrained['yield_scaler'].mean_ = retrained['yield_scaler'].mean_ * 1.1
+    ids = list(farms['farm_id'].astype(str))
+    with pytest.raises(ValueError):
+        predict_by_id(store, ids, retrained)
+
+    reencode_store(store, retrained, chunk_size=64)
+    predictions = predict_by_id(store, ids, retrained)
+    np.testing.assert_array_equal(predictions['per_acre'], _batch(farms, retrained)['per_acre'])
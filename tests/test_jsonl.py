@@ -0,0 +1,20 @@
+import io
+import json
+from integrated_farm_recommendations import generate_recommendations, run_jsonl
+
+def test_run_jsonl_one_output_per_line(models, farms):
+    records = farms.head(3).to_dict('records')
+    lines = [json.dumps(record) for record in records]
+    lines.insert(1, '{"current_crop": "Rice",')
+    output = io.StringIO()
+    run_jsonl(io.StringIO('\n'.join(lines) + '\n\n'), output)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert len(results) == 4
+    assert results[1]['input'] == lines[1]
+    assert 'error' in results[1] and 'recommendations' not in results[1]
+    for record, result in zip(records, results[:1] + results[2:]):
+        assert result['input'] == record
+        expected = generate_recommendations(record, models)
+        assert set(result['recommendations']) == set(expected)
+        assert result['recommendations']['yield'] == expected['yield']
@@ -0,0 +1,32 @@
+import json
+import pytest
+from load_test import append_results, run_load_test, synthesize_farms
+
+def test_synthesize_farms_reproducible():
+    farms = synthesize_farms(20, seed=3)
+    assert len(farms) == 20
+    assert farms == synthesize_farms(20, seed=3)
+    assert {'temperature', 'rainfall_level', 'water_ph', 'salinity_level'} <= set(farms[0])
+
+@pytest.mark.parametrize('mode', ['thread', 'process'])
+def test_run_load_test_summary(models, mode):
+    farms = synthesize_farms(12, seed=0)
+    # A record missing required fields counts as an error, not a crash
+    farms.append({'current_crop': 'Rice'})
+    result = run_load_test(farms, mode, concurrency=2, models=models)
+    assert result['requests'] == 13
+    assert result['errors'] == 1
+    assert result['mode'] == mode and result['concurrency'] == 2
+    assert 0 < result['latency_p50_ms'] <= result['latency_p95_ms'] <= result['latency_p99_ms']
+    assert result['throughput_rps'] > 0
+
+def test_unknown_mode(models):
+    with pytest.raises(ValueError):
+        run_load_test(synthesize_farms(2, seed=0), 'async', models=models)
+
+def test_append_results(tmp_path):
+    path = tmp_path / 'results.jsonl'
+    append_results([{'mode': 'thread'}], path)
+    append_results([{'mode': 'process'}, {'mode': 'thread'}], path)
+    with open(path) as f:
+        assert [json.loads(line)['mode'] for line in f] == ['thread', 'process', 'thread']
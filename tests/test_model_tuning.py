@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from model_tuning import encode_folds, evaluate_candidates, expand_grid, select_best
+from integrated_farm_recommendations import yield_numerical_features
+
+def test_expand_grid_every_combination():
+    grid = expand_grid({'n_estimators': [10, 20], 'max_depth': [None, 5, 10]})
+    assert len(grid) == 6
+    assert {'n_estimators': 20, 'max_depth': 5} in grid
+
+def test_select_best_respects_budget():
+    results = pd.DataFrame({
+        'params': [{'n': 1}, {'n': 2}, {'n': 3}],
+        'cv_rmse': [1.0, 2.0, 3.0],
+        'latency_p99_ms': [80.0, 20.0, 10.0]
+    })
+    assert select_best(results, 50.0)['params'] == {'n': 2}
+    assert select_best(results, 5.0) is None
+
+def test_folds_scaled_on_training_part_only(tmp_path):
+    data_path = tmp_path / 'farms.csv'
+    pd.read_csv('sustainable_farming_dataset.csv').head(300).to_csv(data_path, index=False)
+    folds = encode_folds(str(data_path), n_splits=3)
+    assert len(folds) == 3
+    assert sum(len(X_test) for _, _, X_test, _ in folds) == 300
+    for X_train, y_train, X_test, y_test in folds:
+        assert len(X_train) == len(y_train) and len(X_test) == len(y_test)
+        np.testing.assert_allclose(X_train[yield_numerical_features].mean(), 0, atol=1e-9)
+
+def test_evaluate_candidates_one_row_per_candidate(tmp_path):
+    data_path = tmp_path / 'farms.csv'
+    pd.read_csv('sustainable_farming_dataset.csv').head(300).to_csv(data_path, index=False)
+    grid = {'n_estimators': [5, 10], 'max_depth': [3]}
+    results = evaluate_candidates(grid, n_splits=2, n_jobs=1, latency_calls=5, data_path=str(data_path))
+    assert len(results) == 2
+    assert sorted(p['n_estimators'] for p in results['params']) == [5, 10]
+    assert results['cv_rmse'].is_monotonic_increasing
+    assert (results['latency_p99_ms'] >= results['latency_p50_ms']).all()
+    assert (results['model_size_mb'] > 0).all()
@@ -0,0 +1,10 @@
+import os
+from partial_dependence import load_or_compute_partial_dependence
+
+def test_cache_shared_across_callers(models, tmp_path):
+    load_or_compute_partial_dependence(models, cache_dir=tmp_path, n_samples=200, n_jobs=1)
+    # Spelling out a default or changing n_jobs must hit the same file
+    load_or_compute_partial_dependence(models, cache_dir=tmp_path, n_samples=200, grid_size=20)
+    assert len(os.listdir(tmp_path)) == 1
+    load_or_compute_partial_dependence(models, cache_dir=tmp_path, n_samples=300)
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,93 @@
+import sqlite3
+import time
+import pytest
+from recommendation_history import (
+    HistoryWriter,
+    history_summary,
+    open_history,
+    recent_history,
+    rollup_columns
+)
+
+def _record(crop='Rice'):
+    return {'farm_id': 'F1', 'current_crop': crop, 'soil_type': 'Loamy', 'season': 'Kharif',
+            'irrigation_type': 'Drip'}
+
+def _outputs(per_acre=100.0):
+    return {'crop_rotation': {'next_crop': 'Wheat', 'rotation_score': 75.0},
+            'yield': {'per_acre': per_acre, 'total': per_acre * 10, 'weather_impact': 1.0}}
+
+def test_record_flush_query(tmp_path):
+    path = str(tmp_path / 'history.db')
+    writer = HistoryWriter(path, flush_interval=0.05)
+    writer.record(_record(), _outputs(100.0), 5.0, 'test', 'abc')
+    writer.record(_record(), _outputs(120.0), 7.0, 'test', 'abc')
+    writer.record(_record('Wheat'), _outputs(80.0), 3.0, 'test', 'abc')
+    writer.flush()
+    assert writer.written == 3
+
+    conn = open_history(path)
+    summary = history_summary(conn, since=time.time() - 86400).set_index('crop')
+    assert summary.loc['Rice', 'recommendations'] == 2
+    assert summary.loc['Rice', 'mean_yield_per_acre'] == pytest.approx(110.0)
+    assert summary.loc['Rice', 'mean_latency_ms'] == pytest.approx(6.0)
+    recent = recent_history(conn, crop='Wheat')
+    assert recent['next_crop'].tolist() == ['Wheat'] and recent['model_version'].tolist() == ['abc']
+    writer.close()
+
+def test_failed_batch_does_not_stop_the_writer(tmp_path):
+    writer = HistoryWriter(str(tmp_path / 'history.db'), flush_interval=0.05)
+    # A list cannot be bound as a SQLite value, so this batch fails to insert
+    writer.record(_record(), _outputs([1.0]))
+    writer.flush()
+    assert writer.failed == 1 and writer.written == 0
+    writer.record(_record(), _outputs(100.0))
+    writer.flush()
+    assert writer.written == 1
+    writer.close()
+
+def test_old_rollup_layout_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'history.db')
+    writer = HistoryWriter(path, flush_interval=0.05)
+    writer.record(_record(), _outputs(100.0), 5.0)
+    writer.close()
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE recommendation_rollup")
+    conn.execute("CREATE TABLE recommendation_rollup (day TEXT, crop TEXT, soil_type TEXT, season TEXT, "
+                 "recommendations INTEGER, yield_sum REAL, latency_sum REAL)")
+    conn.commit()
+    conn.close()
+
+    conn = open_history(path)
+    assert [row[1] for row in conn.execute("PRAGMA table_info(recommendation_rollup)")] == rollup_columns
+    assert history_summary(conn)['recommendations'].tolist() == [1]
+
+def test_unknown_detail_layout_is_refused(tmp_path):
+    path = str(tmp_path / 'history.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE recommendations (id INTEGER PRIMARY KEY, created_at REAL)")
+    conn.commit()
+    conn.close()
+    with pytest.raises(ValueError):
+        open_history(path)
+
+def test_interactive_prompt_logs_generated_bundle(models, tmp_path, monkeypatch, capsys):
+    import json
+    import integrated_farm_recommendations as ifr
+    answers = iter(['Rice', 'Wheat', 'Maize', 'Rice', 'Loamy', 'Kharif', '3.5', '6.5', 'Urea', 'Chemical',
+                    'Synthetic Insecticides', 'Chemical', 'Drip', '10', '28', 'Moderate', '7', 'Low'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    path = str(tmp_path / 'history.db')
+    writer = HistoryWriter(path, flush_interval=0.05)
+    ifr.main(models, writer)
+    writer.close()
+
+    source, inputs, outputs = open_history(path).execute(
+        "SELECT source, inputs, outputs FROM recommendations").fetchone()
+    assert source == 'interactive'
+    logged = json.loads(outputs)
+    expected = json.loads(json.dumps(ifr.generate_recommendations(json.loads(inputs), models)))
+    # The next crop is drawn at random from the crop's successors
+    assert logged['crop_rotation'].pop('next_crop') in ifr.crop_patterns['Rice']
+    expected['crop_rotation'].pop('next_crop')
+    assert logged == expected
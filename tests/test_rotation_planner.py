@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+from integrated_farm_recommendations import calculate_rotation_scores, predict_yield_batch
+from rotation_planner import _successors, plan_rotation
+from rotation_simulator import season_cycle
+
+def _sequences(crop, n_seasons):
+    if n_seasons == 0:
+        yield ()
+        return
+    for nxt in _successors(crop):
+        for rest in _sequences(nxt, n_seasons - 1):
+            yield (nxt,) + rest
+
+def _brute_force(farm, models, n_seasons, rotation_weight, yield_weight):
+    """Score every reachable crop sequence independently and keep the best"""
+    best = None
+    for sequence in _sequences(farm['current_crop'], n_seasons):
+        history = [farm['prev_crop3'], farm['prev_crop2'], farm['prev_crop1'], farm['current_crop']]
+        season = farm['season']
+        rows = []
+        for crop in sequence:
+            history.append(crop)
+            season = season_cycle.get(season, season)
+            rows.append({**farm, 'current_crop': crop, 'prev_crop1': history[-2],
+                         'prev_crop2': history[-3], 'prev_crop3': history[-4], 'season': season})
+        rows = pd.DataFrame(rows)
+        per_acre = predict_yield_batch(rows, models['yield_model'], models['yield_le_dict'],
+                                       models['yield_scaler'])['per_acre'].to_numpy()
+        rotation = calculate_rotation_scores(rows['current_crop'], rows['prev_crop1'],
+                                             rows['prev_crop2'], rows['prev_crop3'])
+        objective = float((rotation_weight * rotation + yield_weight * per_acre).sum())
+        if best is None or objective > best[0]:
+            best = (objective, sequence)
+    return best
+
+@pytest.mark.parametrize('rotation_weight, yield_weight', [(1.0, 1.0), (1.0, 0.0), (0.0, 1.0)])
+def test_plan_matches_brute_force(models, farms, rotation_weight, yield_weight):
+    for farm in farms.head(3).to_dict('records'):
+        result = plan_rotation(farm, models, n_seasons=3,
+                               rotation_weight=rotation_weight, yield_weight=yield_weight)
+        objective, _ = _brute_force(farm, models, 3, rotation_weight, yield_weight)
+        assert result['objective'] == pytest.approx(objective)
+
+        plan = result['plan']
+        assert [step['season_index'] for step in plan] == [1, 2, 3]
+        crops = [farm['current_crop']] + [step['crop'] for step in plan]
+        assert all(nxt in _successors(cur) for cur, nxt in zip(crops, crops[1:]))
+        planned = sum(rotation_weight * step['rotation_score'] + yield_weight * step['yield_per_acre']
+                      for step in plan)
+        assert planned == pytest.approx(objective)
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+from integrated_farm_recommendations import calculate_weather_impact, crop_water_requirements
+from seasonal_weather import seasonal_weather_impacts
+
+@pytest.mark.parametrize('temperature', [5.0, 12.0, 22.0, 33.0, 41.0])
+@pytest.mark.parametrize('rainfall_level, share', [('Low', 0.2), ('Moderate', 1.0), ('High', 2.0)])
+def test_constant_season_matches_single_prediction(farms, temperature, rainfall_level, share):
+    farm = farms[(farms['current_crop'] == 'Rice') & (farms['season'] == 'Kharif')].head(1)
+    days = 100
+    daily_rain = crop_water_requirements['Rice']['Kharif'] * share / days
+    readings = pd.DataFrame({'farm_id': np.repeat(farm['farm_id'].astype(str).to_numpy(), days),
+                             'temperature': temperature, 'rainfall_mm': daily_rain})
+    season = seasonal_weather_impacts(readings, farm)
+    assert season['rainfall_level'].iloc[0] == rainfall_level
+    assert season['weather_impact'].iloc[0] == calculate_weather_impact(temperature, rainfall_level)
+
+def test_farm_without_readings_is_neutral(farms):
+    season = seasonal_weather_impacts(pd.DataFrame(columns=['farm_id', 'temperature', 'rainfall_mm']), farms.head(3))
+    assert (season['weather_impact'] == 1.0).all()
+
+def test_optimal_degree_days(farms):
+    # Rice's optimal range is 25-35 C
+    farm = farms[farms['current_crop'] == 'Rice'].head(1)
+    temperatures = [20.0, 27.5, 30.0, 40.0]
+    readings = pd.DataFrame({'farm_id': str(farm['farm_id'].iloc[0]), 'temperature': temperatures,
+                             'rainfall_mm': 0.0})
+    season = seasonal_weather_impacts(readings, farm).iloc[0]
+    assert season['optimal_degree_days'] == 0 + 2.5 + 5 + 10
+    assert (season['days_below_optimal'], season['days_above_optimal']) == (1, 1)
@@ -0,0 +1,48 @@
+import joblib
+import numpy as np
+from integrated_farm_recommendations import generate_recommendations
+from shadow_evaluation import ShadowEvaluator
+
+def test_identical_candidate_has_zero_delta(models, farms, tmp_path):
+    candidate_path = tmp_path / 'candidate.joblib'
+    joblib.dump({key: models[key] for key in ('yield_model', 'yield_le_dict', 'yield_scaler')}, candidate_path)
+    rng = np.random.default_rng(1)
+    farms = farms.assign(temperature=rng.uniform(0, 45, len(farms)).round(1),
+                         rainfall_level=rng.choice(['Low', 'Moderate', 'High'], len(farms)))
+
+    shadow = ShadowEvaluator(str(candidate_path), batch_size=64, linger=0.05)
+    for record in farms.to_dict('records'):
+        prediction = generate_recommendations(record, models)['yield']
+        shadow.submit(record, prediction['per_acre'], prediction['weather_impact'])
+    shadow.flush()
+
+    summary = shadow.snapshot()
+    assert summary['scored'] == len(farms)
+    assert summary['errors'] == 0
+    assert summary['mean_abs_delta'] == 0
+    assert summary['abs_delta_max'] == 0
+
+def test_failed_batch_is_counted_and_scoring_continues(models, farms, tmp_path):
+    candidate_path = tmp_path / 'candidate.joblib'
+    joblib.dump({key: models[key] for key in ('yield_model', 'yield_le_dict', 'yield_scaler')}, candidate_path)
+    shadow = ShadowEvaluator(str(candidate_path), linger=0.05, summary_path=str(tmp_path / 'missing' / 'summary.json'),
+                             publish_interval=0)
+    shadow.submit({'farm_id': 'broken'}, 100.0, 1.0)
+    shadow.flush()
+    record = farms.to_dict('records')[0]
+    prediction = generate_recommendations(record, models)['yield']
+    shadow.submit(record, prediction['per_acre'], prediction['weather_impact'])
+    shadow.flush()
+
+    summary = shadow.snapshot()
+    assert summary['errors'] == 1
+    assert summary['scored'] == 1
+    # The summary directory does not exist, so every publish fails without stopping the loop
+    assert summary['publish_errors'] >= 1
+
+def test_missing_candidate_does_not_block_flush(farms, tmp_path):
+    shadow = ShadowEvaluator(str(tmp_path / 'missing.joblib'), linger=0.05)
+    for record in farms.head(3).to_dict('records'):
+        shadow.submit(record, 100.0, 1.0)
+    shadow.flush()
+    assert shadow.snapshot()['errors'] == 3
@@ -0,0 +1,28 @@
+import numpy as np
+from integrated_farm_recommendations import (
+    build_yield_features,
+    encode_yield_features,
+    model_version,
+    predict_yield_batch
+)
+from shared_model import export_shared_models, load_flat_forest, load_shared_models, shared_model_version
+
+def test_flat_forest_matches_model(models, farms, tmp_path):
+    model = models['yield_model']
+    export_shared_models(models, tmp_path)
+    forest = load_flat_forest(tmp_path)
+    X = encode_yield_features(build_yield_features(farms), models['yield_le_dict'], models['yield_scaler'])
+    np.testing.assert_allclose(forest.predict(X), model.predict(X), rtol=1e-12)
+    assert isinstance(forest.arrays['value'], np.memmap)
+
+def test_shared_models_predict_like_pickled(models, farms, tmp_path):
+    export_shared_models(models, tmp_path)
+    shared = load_shared_models(tmp_path)
+    expected = predict_yield_batch(farms, models['yield_model'], models['yield_le_dict'], models['yield_scaler'])
+    result = predict_yield_batch(farms, shared['yield_model'], shared['yield_le_dict'], shared['yield_scaler'])
+    np.testing.assert_array_equal(result['per_acre'], expected['per_acre'])
+
+def test_shared_model_version(models, tmp_path):
+    assert shared_model_version(tmp_path) is None
+    export_shared_models(models, tmp_path)
+    assert shared_model_version(tmp_path) == model_version(models)
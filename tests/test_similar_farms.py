@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from integrated_farm_recommendations import farm_records_from_dataset
+from similar_farms import (
+    DATA_PATH,
+    build_similar_farm_index,
+    find_similar_farms,
+    find_similar_farms_batch
+)
+
+def test_dataset_farm_finds_itself(models):
+    index = build_similar_farm_index(models['yield_scaler'])
+    data = pd.read_csv(DATA_PATH)
+    farms = farm_records_from_dataset(data.head(50))
+    for position, farm in enumerate(farms.to_dict('records')):
+        similar = find_similar_farms(index, farm, k=3)
+        # Index and query derive the rotation score the same way, so the farm is at distance 0
+        assert similar['distance'].iloc[0] == 0
+        assert farm['farm_id'] in similar.loc[similar['distance'] == 0, 'Farm_ID'].tolist()
+
+def test_batch_matches_single(models, farms):
+    index = build_similar_farm_index(models['yield_scaler'])
+    batch = find_similar_farms_batch(index, farms, k=4)
+    for position, farm in enumerate(farms.head(20).to_dict('records')):
+        single = find_similar_farms(index, farm, k=4)
+        assert np.allclose(single['distance'], batch.loc[batch['query'] == position, 'distance'])
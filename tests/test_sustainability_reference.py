@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sustainability_reference import SustainabilityReference, sustainability_weights
+
+columns = list(sustainability_weights)
+
+def _full_rank_score(data, row):
+    """Append the row and re-run the dataset.py formula over everything"""
+    extended = pd.concat([data[columns], pd.DataFrame([row], columns=columns)], ignore_index=True)
+    score = sum((extended[col].rank(pct=True) * -1 + 1) * weight
+                for col, weight in sustainability_weights.items())
+    return score.iloc[-1]
+
+@pytest.fixture(scope='module')
+def reference_data():
+    data = pd.read_csv('sustainable_farming_dataset.csv')[columns].head(500)
+    # Repeat some rows so that ties are exercised
+    return pd.concat([data, data.head(50)], ignore_index=True)
+
+def _new_rows(data):
+    rng = np.random.default_rng(0)
+    fresh = [[rng.uniform(data[col].min(), data[col].max()) for col in columns] for _ in range(10)]
+    existing = data.sample(10, random_state=0).to_numpy().tolist()
+    extremes = [data.min().tolist(), data.max().tolist(), [-1.0, -1.0, -1.0], [1e9, 1e9, 1e9]]
+    return fresh + existing + extremes
+
+def test_score_matches_full_rank(reference_data):
+    reference = SustainabilityReference.from_frame(reference_data)
+    rows = _new_rows(reference_data)
+    for row in rows:
+        assert reference.score(*row) == pytest.approx(_full_rank_score(reference_data, row))
+    batch = reference.score(*np.array(rows).T)
+    np.testing.assert_allclose(batch, [reference.score(*row) for row in rows])
+
+def test_appended_rows_count_before_and_after_merge(reference_data):
+    base, added = reference_data.iloc[:400], reference_data.iloc[400:]
+    reference = SustainabilityReference.from_frame(base, merge_size=60)
+    for chunk in (added.iloc[:50], added.iloc[50:]):
+        reference.append(*(chunk[col].to_numpy() for col in columns))
+        for row in _new_rows(reference_data)[:15]:
+            expected = _full_rank_score(pd.concat([base, added.loc[:chunk.index[-1]]]), row)
+            assert reference.score(*row) == pytest.approx(expected)
+    assert len(reference) == len(reference_data)
+    assert len(reference.buffer[columns[0]]) == 0
+
+def test_save_and_load(reference_data, tmp_path):
+    reference = SustainabilityReference.from_frame(reference_data.iloc[:300])
+    reference.append(*(reference_data.iloc[300:][col].to_numpy() for col in columns))
+    path = tmp_path / 'reference.npz'
+    reference.save(path)
+    loaded = SustainabilityReference.load(path)
+    assert len(loaded) == len(reference_data)
+    row = _new_rows(reference_data)[0]
+    assert loaded.score(*row) == pytest.approx(reference.score(*row))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from integrated_farm_recommendations import calculate_fertilizer_usage, fertilizer_mapping, pesticide_mapping
+from transition_planner import monthly_product_demand, parse_transition_time, transition_schedule
+
+@pytest.mark.parametrize('text, expected', [
+    ('3-6 months', (3, 6)), ('1 month', (1, 1)), (' 2 - 3 Months ', (2, 3)), ('Already sustainable', (0, 0))
+])
+def test_parse_transition_time(text, expected):
+    assert parse_transition_time(text) == expected
+
+def test_parse_transition_time_rejects_unknown():
+    with pytest.raises(ValueError):
+        parse_transition_time('next spring')
+
+def test_empty_fleet(farms):
+    assert transition_schedule(farms.head(0)).empty
+    demand = monthly_product_demand(farms.head(0), horizon=6)
+    assert demand.empty
+    assert list(demand.columns) == ['farms'] + [f'month_{m}' for m in range(1, 7)]
+
+def test_schedule_matches_mappings(farms):
+    schedule = transition_schedule(farms).set_index(['farm_id', 'input'])
+    mappings = {'fertilizer': (fertilizer_mapping, 'fertilizer_category', 'current_fertilizer'),
+                'pesticide': (pesticide_mapping, 'pesticide_category', 'current_pesticide')}
+    for farm in farms.to_dict('records'):
+        for name, (mapping, category, current) in mappings.items():
+            alternative = mapping.get(farm[category], {}).get(farm[current])
+            key = (farm['farm_id'], name)
+            if alternative is None or parse_transition_time(alternative['transition_time'])[1] == 0:
+                assert key not in schedule.index
+            else:
+                assert schedule.loc[key, 'product'] == alternative['organic']
+    fertilizer = schedule.xs('fertilizer', level='input')
+    area = farms.set_index('farm_id').loc[fertilizer.index, 'farm_area'].to_numpy()
+    np.testing.assert_allclose(fertilizer['monthly_quantity'], calculate_fertilizer_usage(area, 'Organic') / 4)
+
+@pytest.mark.parametrize('scenario', ['slow', 'mid', 'fast'])
+def test_demand_matches_per_farm_ramp(farms, scenario):
+    horizon = 8
+    demand = monthly_product_demand(farms, horizon, scenario)
+    expected = {}
+    for row in transition_schedule(farms).itertuples():
+        duration = {'slow': row.months_high, 'fast': row.months_low,
+                    'mid': (row.months_low + row.months_high) / 2}[scenario]
+        ramp = [row.monthly_quantity * min(month / max(duration, 1), 1.0) for month in range(1, horizon + 1)]
+        key = (row.input, row.product, row.unit)
+        expected[key] = np.add(expected.get(key, 0), ramp)
+    assert sorted(demand.index) == sorted(expected)
+    for key, values in expected.items():
+        np.testing.assert_allclose(demand.loc[key].iloc[1:].to_numpy(dtype=float), values)
+
+def test_unknown_scenario(farms):
+    with pytest.raises(ValueError):
+        monthly_product_demand(farms, scenario='instant')
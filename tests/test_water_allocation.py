@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from integrated_farm_recommendations import crop_water_requirements, irrigation_efficiency
+from water_allocation import allocate_water, water_requirements
+
+def test_water_requirements_match_table(farms):
+    requirement = water_requirements(farms)
+    for i, farm in enumerate(farms.head(20).to_dict('records')):
+        needed = crop_water_requirements.get(farm['current_crop'], {}).get(farm['season'], 0)
+        efficiency = irrigation_efficiency.get(farm['irrigation_type'], 0.7)
+        assert requirement[i] == pytest.approx(needed * farm['farm_area'] / efficiency)
+
+@pytest.mark.parametrize('objective', ['max_yield', 'efficiency'])
+@pytest.mark.parametrize('share', [0.0, 0.3, 0.6, 0.9])
+def test_allocation_respects_budget(models, farms, objective, share):
+    budget = water_requirements(farms).sum() * share
+    allocation = allocate_water(farms, models, budget, objective)
+    assert len(allocation) == len(farms)
+    assert allocation['water_allocated'].sum() <= budget + 1e-6
+    assert (allocation['water_allocated'] <= allocation['water_required'] + 1e-6).all()
+    assert (allocation['predicted_yield'] <= allocation['yield_at_full_requirement'] + 1e-9).all()
+
+@pytest.mark.parametrize('objective', ['max_yield', 'efficiency'])
+def test_full_budget_funds_every_farm(models, farms, objective):
+    allocation = allocate_water(farms, models, water_requirements(farms).sum(), objective)
+    np.testing.assert_allclose(allocation['predicted_yield'], allocation['yield_at_full_requirement'])
+
+def test_more_water_never_lowers_yield(models, farms):
+    total = water_requirements(farms).sum()
+    yields = [allocate_water(farms, models, total * share)['predicted_yield'].sum()
+              for share in (0.2, 0.5, 0.8)]
+    assert yields == sorted(yields)
+
+def test_unknown_objective(models, farms):
+    with pytest.raises(ValueError):
+        allocate_water(farms, models, 1000.0, objective='fairness')
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from integrated_farm_recommendations import (
+    calculate_weather_impact,
+    calculate_weather_impacts,
+    generate_recommendations,
+    predict_yield_batch
+)
+
+@pytest.mark.parametrize('temperature', [-5.0, 0.0, 12.0, 14.9, 15.0, 22.5, 30.0, 31.8, 36.6, 45.0, 60.0])
+@pytest.mark.parametrize('rainfall_level', ['Low', 'Moderate', 'High', 'Unknown'])
+def test_weather_impact_scalar_matches_batch(temperature, rainfall_level):
+    batch = calculate_weather_impacts([temperature], [rainfall_level])[0]
+    assert calculate_weather_impact(temperature, rainfall_level) == batch
+
+def test_weather_impact_half_way_value():
+    # (0.99 + 0.6) / 2 = 0.795, where round() and np.round() disagree
+    assert calculate_weather_impact(30.2, 'Low') == calculate_weather_impacts([30.2], ['Low'])[0]
+
+def test_predict_yield_batch_matches_single(models, farms):
+    rng = np.random.default_rng(0)
+    farms = farms.assign(temperature=rng.uniform(0, 45, len(farms)).round(1),
+                         rainfall_level=rng.choice(['Low', 'Moderate', 'High'], len(farms)))
+    batch = predict_yield_batch(farms, models['yield_model'], models['yield_le_dict'], models['yield_scaler'])
+    for i, record in enumerate(farms.to_dict('records')):
+        single = generate_recommendations(record, models)['yield']
+        assert single['weather_impact'] == batch['weather_impact'].iloc[i]
+        assert single['per_acre'] == batch['per_acre'].iloc[i]
+        assert single['total'] == batch['total'].iloc[i]
@@ -0,0 +1,40 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from integrated_farm_recommendations import (
+    build_yield_features,
+    encode_yield_features,
+    predict_yield_batch
+)
+from yield_explanations import forest_contributions, top_drivers
+
+def test_contributions_sum_to_prediction(models, farms):
+    model = models['yield_model']
+    encoded = encode_yield_features(build_yield_features(farms), models['yield_le_dict'], models['yield_scaler'])
+    baseline, contributions = forest_contributions(model, encoded)
+    assert contributions.shape == (len(farms), model.n_features_in_)
+    np.testing.assert_allclose(baseline + contributions.sum(axis=1), model.predict(encoded), rtol=1e-9)
+
+def test_contributions_independent_of_chunk_size():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = X[:, 0] * 3 + X[:, 1] ** 2 + rng.normal(size=300)
+    model = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+    baseline, contributions = forest_contributions(model, X)
+    _, chunked = forest_contributions(model, X, chunk_size=7)
+    np.testing.assert_allclose(contributions, chunked)
+    np.testing.assert_allclose(baseline + contributions.sum(axis=1), model.predict(X), rtol=1e-9)
+    # Feature 3 is noise, so it gets less credit than the main driver
+    assert np.abs(contributions[:, 0]).mean() > np.abs(contributions[:, 3]).mean()
+
+def test_batch_explanation_columns(models, farms):
+    result = predict_yield_batch(farms, models['yield_model'], models['yield_le_dict'],
+                                 models['yield_scaler'], explain=True)
+    feature_columns = list(encode_yield_features(
+        build_yield_features(farms.head(1)), models['yield_le_dict'], models['yield_scaler']).columns)
+    explained = result['baseline'] + result[feature_columns].sum(axis=1)
+    # Every column is rounded separately, so allow the accumulated rounding error
+    np.testing.assert_allclose(explained, result['per_acre'], atol=0.01 + 0.0005 * len(feature_columns))
+
+def test_top_drivers_by_absolute_effect():
+    drivers = top_drivers({'a': 0.5, 'b': -2.0, 'c': 1.0, 'd': 0.0}, n=2)
+    assert drivers == [('b', -2.0), ('c', 1.0)]
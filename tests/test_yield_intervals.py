@@ -0,0 +1,35 @@
+import numpy as np
+from integrated_farm_recommendations import (
+    build_yield_features,
+    encode_yield_features,
+    predict_yield_batch
+)
+from yield_intervals import prediction_intervals, tree_predictions
+
+def _encoded(models, farms):
+    return encode_yield_features(build_yield_features(farms), models['yield_le_dict'], models['yield_scaler'])
+
+def test_tree_predictions_average_to_forest(models, farms):
+    model = models['yield_model']
+    X = _encoded(models, farms)
+    per_tree = tree_predictions(model, X, n_jobs=1)
+    assert per_tree.shape == (len(farms), len(model.estimators_))
+    np.testing.assert_allclose(per_tree.mean(axis=1), model.predict(X), rtol=1e-9)
+    # Threaded chunks give the same rows back in order
+    np.testing.assert_array_equal(tree_predictions(model, X, n_jobs=4, chunk_size=17), per_tree)
+
+def test_interval_brackets_prediction(models, farms):
+    model = models['yield_model']
+    mean, low, high = prediction_intervals(model, _encoded(models, farms), coverage=0.9)
+    assert np.all(low <= mean) and np.all(mean <= high)
+    _, wide_low, wide_high = prediction_intervals(model, _encoded(models, farms), coverage=0.99)
+    assert np.all(wide_low <= low) and np.all(high <= wide_high)
+
+def test_batch_interval_columns(models, farms):
+    args = (models['yield_model'], models['yield_le_dict'], models['yield_scaler'])
+    plain = predict_yield_batch(farms, *args)
+    result = predict_yield_batch(farms, *args, interval=0.9)
+    np.testing.assert_allclose(result['per_acre'], plain['per_acre'], atol=0.01)
+    assert (result['per_acre_low'] <= result['per_acre']).all()
+    assert (result['per_acre'] <= result['per_acre_high']).all()
+    assert (result['total_low'] <= result['total_high']).all()
@@ -0,0 +1,136 @@
+import argparse
+import re
+import time
+import numpy as np
+import pandas as pd
+from integrated_farm_recommendations import (
+    fertilizer_mapping,
+    pesticide_mapping,
+    calculate_fertilizer_usage,
+    calculate_pesticide_usage,
+    farm_records_from_dataset
+)
+
+# Kharif, Rabi and Zaid each span about four months
+months_per_season = 4
+
+# How each input is looked up and quantified; quantities are per season
+transition_inputs = {
+    'fertilizer': {'mapping': fertilizer_mapping, 'category': 'fertilizer_category',
+                   'current': 'current_fertilizer', 'usage': calculate_fertilizer_usage, 'unit': 'tons'},
+    'pesticide': {'mapping': pesticide_mapping, 'category': 'pesticide_category',
+                  'current': 'current_pesticide', 'usage': calculate_pesticide_usage, 'unit': 'kg'}
+}
+
+def parse_transition_time(text):
+    """Month range of a transition_time string.
+
+    '3-6 months' -> (3, 6), '3 months' -> (3, 3), 'Already sustainable' -> (0, 0).
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*(?:-\s*(\d+))?\s*months?\s*', text, re.IGNORECASE)
+    if match:
+        low = int(match.group(1))
+        return low, int(match.group(2) or low)
+    if text.strip().lower().startswith('already'):
+        return 0, 0
+    raise ValueError(f"Unrecognized transition time: {text}")
+
+def _transition_table(mapping):
+    rows = [(category, current, alternative['organic'], *parse_transition_time(alternative['transition_time']))
+            for category, products in mapping.items()
+            for current, alternative in products.items()]
+    return pd.DataFrame(rows, columns=['category', 'current', 'product', 'months_low', 'months_high'])
+
+def transition_schedule(farms):
+    """One row per farm and input that has an organic alternative to move to.
+
+    monthly_quantity is what the farm needs each month once the transition
+    is complete: the organic usage from calculate_fertilizer_usage() /
+    calculate_pesticide_usage() for its area, spread over a season. Farms
+    that are already sustainable or use products without a mapping are
+    left out.
+    """
+    schedules = []
+    for name, spec in transition_inputs.items():
+        table = _transition_table(spec['mapping'])
+        # Look farms up through the codes of their (category, current product) pairs
+        category_codes, categories = pd.factorize(farms[spec['category']])
+        current_codes, currents = pd.factorize(farms[spec['current']])
+        lookup = np.full((len(categories) + 1, len(currents) + 1), -1)
+        category_at, current_at = categories.get_indexer(table['category']), currents.get_indexer(table['current'])
+        present = (category_at >= 0) & (current_at >= 0)
+        lookup[category_at[present], current_at[present]] = np.flatnonzero(present)
+        # Missing values get code -1, which lands on the spare last row/column
+        row = lookup[category_codes, current_codes]
+        row = np.where((row >= 0) & (table['months_high'].to_numpy()[row] > 0), row, -1)
+        needed = row >= 0
+        row = row[needed]
+        area = farms['farm_area'].astype(float).to_numpy()[needed]
+        schedules.append(pd.DataFrame({
+            'farm_id': farms['farm_id'].to_numpy()[needed] if 'farm_id' in farms else np.flatnonzero(needed),
+            'input': name,
+            'product': table['product'].to_numpy()[row],
+            'months_low': table['months_low'].to_numpy()[row],
+            'months_high': table['months_high'].to_numpy()[row],
+            'monthly_quantity': spec['usage'](area, 'Organic') / months_per_season,
+            'unit': spec['unit']
+        }))
+    return pd.concat(schedules, ignore_index=True)
+
+def monthly_product_demand(farms, horizon=12, scenario='slow'):
+    """Fleet-wide monthly demand per organic product over the next `horizon` months.
+
+    Each farm phases its organic product in linearly over its transition,
+    reaching full use at the end: the upper end of the window for
+    scenario='slow', the lower end for 'fast', their mean for 'mid'.
+    Farms are first summed by product and transition length, so the
+    per-month expansion only touches a handful of groups.
+    """
+    schedule = transition_schedule(farms)
+    if scenario == 'slow':
+        duration = schedule['months_high'].to_numpy(dtype=float)
+    elif scenario == 'fast':
+        duration = schedule['months_low'].to_numpy(dtype=float)
+    elif scenario == 'mid':
+        duration = (schedule['months_low'] + schedule['months_high']).to_numpy(dtype=float) / 2
+    else:
+        raise ValueError(f"Unknown transition scenario: {scenario}")
+
+    groups = schedule.groupby(['input', 'product', 'unit'], sort=True)
+    product_codes = groups.ngroup().to_numpy()
+    product_index = list(groups.groups)
+    duration_codes, durations = pd.factorize(np.maximum(duration, 1))
+    n_durations = len(durations)
+    # Full monthly quantity per (product, transition length)
+    totals = np.bincount(product_codes * n_durations + duration_codes,
+                         weights=schedule['monthly_quantity'].to_numpy(),
+                         minlength=len(product_index) * n_durations).reshape(len(product_index), n_durations)
+    farm_counts = np.bincount(product_codes, minlength=len(product_index))
+
+    months = np.arange(1, horizon + 1)
+    share = np.minimum(months[None, :] / np.asarray(durations, dtype=float)[:, None], 1.0)
+    demand = pd.DataFrame(totals @ share, columns=[f'month_{m}' for m in months],
+                          index=pd.MultiIndex.from_tuples(product_index, names=['input', 'product', 'unit']))
+    demand.insert(0, 'farms', farm_counts)
+    return demand
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monthly organic input demand for farms transitioning")
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--scenario', choices=['slow', 'mid', 'fast'], default='slow')
+    parser.add_argument('--farms', type=int, default=0, help="resample the dataset to this many farms")
+    parser.add_argument('--output', help="optional CSV path for the demand table")
+    args = parser.parse_args()
+
+    data = pd.read_csv('sustainable_farming_dataset.csv')
+    if args.farms:
+        data = data.sample(args.farms, replace=True, random_state=0)
+    farms = farm_records_from_dataset(data)
+
+    start = time.perf_counter()
+    demand = monthly_product_demand(farms, args.months, args.scenario)
+    elapsed = time.perf_counter() - start
+    print(demand.round(1).to_string())
+    print(f"\nPlanned {len(farms)} farms in {elapsed:.2f}s")
+    if args.output:
+        demand.to_csv(args.output)
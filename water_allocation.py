@@ -0,0 +1,150 @@
+import argparse
+import time
+import pandas as pd
+import numpy as np
+from integrated_farm_recommendations import (
+    crop_water_requirements,
+    irrigation_efficiency,
+    build_yield_features,
+    encode_yield_features,
+    calculate_weather_impacts,
+    farm_records_from_dataset,
+    load_or_train_models
+)
+
+# Share of each farm's requirement that can be allocated
+default_levels = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+def water_requirements(farms):
+    """Vectorized total_water_needed from get_water_management_recommendation().
+
+    Farms whose crop/season has no entry in crop_water_requirements get 0.
+    """
+    requirement_table = pd.DataFrame(crop_water_requirements).T.stack()
+    keys = pd.MultiIndex.from_arrays([farms['current_crop'], farms['season']])
+    water_needed = requirement_table.reindex(keys).fillna(0).to_numpy()
+    efficiency = farms['irrigation_type'].map(irrigation_efficiency).fillna(0.7).to_numpy()
+    return water_needed * farms['farm_area'].astype(float).to_numpy() / efficiency
+
+def yield_response(farms, models, levels=default_levels):
+    """Predicted total yield (tons) of every farm at every allocation level.
+
+    All farms and levels are scored in one model call. Water is scaled into
+    the model's Water_Usage feature; the curve is made non-decreasing since
+    a farm can always leave extra water unused.
+    """
+    features = build_yield_features(farms)
+    n = len(features)
+    stacked = pd.concat([features] * len(levels), ignore_index=True)
+    stacked['Water_Usage(cubic meters)'] *= np.repeat(levels, n)
+    encoded = encode_yield_features(stacked, models['yield_le_dict'], models['yield_scaler'])
+
+    weather = calculate_weather_impacts(farms['temperature'], farms['rainfall_level'])
+    area = farms['farm_area'].astype(float).to_numpy()
+    per_acre = models['yield_model'].predict(encoded).reshape(len(levels), n).T
+    return np.maximum.accumulate(per_acre * (weather * area)[:, None], axis=1)
+
+def _allocate_max_yield(water, yields, budget, iterations=60):
+    """Maximize total yield with a Lagrangian price on water.
+
+    For a price p each farm independently picks the level maximizing
+    yield - p * water; p is bisected until the budget is met, then the
+    leftover budget buys the best remaining single-level upgrades.
+    """
+    rows = np.arange(len(water))
+
+    def choose(price):
+        return np.argmax(yields - price * water, axis=1)
+
+    low, high = 0.0, float(np.max(yields / np.maximum(water, 1e-9))) + 1.0
+    if water[rows, choose(0.0)].sum() <= budget:
+        return choose(0.0)
+    for _ in range(iterations):
+        price = (low + high) / 2
+        if water[rows, choose(price)].sum() > budget:
+            low = price
+        else:
+            high = price
+    choice = choose(high)
+
+    # Spend what is left on the upgrades with the best yield per unit water
+    remaining = budget - water[rows, choice].sum()
+    can_upgrade = choice < water.shape[1] - 1
+    upgrade = np.minimum(choice + 1, water.shape[1] - 1)
+    cost = water[rows, upgrade] - water[rows, choice]
+    gain = yields[rows, upgrade] - yields[rows, choice]
+    ratio = np.where(can_upgrade & (cost > 0), gain / np.maximum(cost, 1e-9), -np.inf)
+    order = np.argsort(-ratio)
+    order = order[np.isfinite(ratio[order]) & (ratio[order] > 0)]
+    affordable = np.cumsum(cost[order]) <= remaining
+    choice[order[affordable]] += 1
+    return choice
+
+def _allocate_efficiency(water, yields, budget):
+    """Give full requirements to the farms with the best yield per unit water"""
+    full_water, full_yield = water[:, -1], yields[:, -1]
+    ratio = np.where(full_water > 0, full_yield / np.maximum(full_water, 1e-9), np.inf)
+    order = np.argsort(-ratio)
+    funded = np.zeros(len(water), dtype=bool)
+    funded[order[np.cumsum(full_water[order]) <= budget]] = True
+    return np.where(funded, water.shape[1] - 1, 0)
+
+def allocate_water(farms, models, budget, objective='max_yield', levels=default_levels):
+    """Split a fixed water budget across farms.
+
+    objective='max_yield' maximizes total predicted yield over partial
+    allocation levels; objective='efficiency' funds whole requirements in
+    order of yield per unit water. Returns one row per farm.
+    """
+    farms = farms.reset_index(drop=True)
+    levels = np.asarray(levels, dtype=float)
+    requirement = water_requirements(farms)
+    water = requirement[:, None] * levels[None, :]
+    yields = yield_response(farms, models, levels)
+
+    if objective == 'max_yield':
+        choice = _allocate_max_yield(water, yields, budget)
+    elif objective == 'efficiency':
+        choice = _allocate_efficiency(water, yields, budget)
+    else:
+        raise ValueError(f"Unknown allocation objective: {objective}")
+
+    rows = np.arange(len(farms))
+    allocation = pd.DataFrame({
+        'farm_id': farms['farm_id'].to_numpy() if 'farm_id' in farms else rows,
+        'crop': farms['current_crop'].to_numpy(),
+        'season': farms['season'].to_numpy(),
+        'irrigation_type': farms['irrigation_type'].to_numpy(),
+        'water_required': requirement,
+        'water_allocated': water[rows, choice],
+        'share_of_requirement': levels[choice],
+        'predicted_yield': yields[rows, choice],
+        'yield_at_full_requirement': yields[:, -1]
+    })
+    return allocation
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split a seasonal water budget across many farms")
+    parser.add_argument('--farms', type=int, default=100000, help="number of farms sampled from the dataset")
+    parser.add_argument('--budget-share', type=float, default=0.6,
+                        help="budget as a share of the fleet's total requirement")
+    parser.add_argument('--objective', choices=['max_yield', 'efficiency'], default='max_yield')
+    parser.add_argument('--output', help="optional CSV path for the allocation table")
+    args = parser.parse_args()
+
+    models = load_or_train_models()
+    data = pd.read_csv('sustainable_farming_dataset.csv')
+    farms = farm_records_from_dataset(data.sample(args.farms, replace=True, random_state=0))
+    budget = water_requirements(farms).sum() * args.budget_share
+
+    start = time.perf_counter()
+    allocation = allocate_water(farms, models, budget, args.objective)
+    elapsed = time.perf_counter() - start
+
+    print(f"Allocated {allocation['water_allocated'].sum():,.0f} of {budget:,.0f} mm "
+          f"to {len(allocation)} farms in {elapsed:.2f}s")
+    print(f"Predicted yield: {allocation['predicted_yield'].sum():,.0f} tons "
+          f"(unconstrained: {allocation['yield_at_full_requirement'].sum():,.0f} tons)")
+    print(allocation.groupby('share_of_requirement').size().rename('farms'))
+    if args.output:
+        allocation.to_csv(args.output, index=False)
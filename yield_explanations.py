@@ -0,0 +1,84 @@
+import weakref
+import numpy as np
+
+# Leaf contribution tables, one per fitted forest, dropped when the model goes away
+_contribution_cache = weakref.WeakKeyDictionary()
+
+def _tree_leaf_contributions(tree, n_features):
+    """Path-based (Saabas) contributions for every node of one tree.
+
+    Moving from a parent node to a child changes the running prediction by
+    value[child] - value[parent]; that change is credited to the feature the
+    parent split on. Nodes are stored parent-before-child, so one pass down
+    the tree, level by level, accumulates the whole path for every node.
+    """
+    values = tree.value[:, 0, 0]
+    cumulative = np.zeros((tree.node_count, n_features))
+    frontier = np.array([0])
+    while frontier.size:
+        frontier = frontier[tree.children_left[frontier] >= 0]
+        for children in (tree.children_left[frontier], tree.children_right[frontier]):
+            cumulative[children] = cumulative[frontier]
+            cumulative[children, tree.feature[frontier]] += values[children] - values[frontier]
+        frontier = np.concatenate([tree.children_left[frontier], tree.children_right[frontier]])
+    return cumulative
+
+def _contribution_table(model):
+    """Stack the leaf rows of every tree into one table, keyed by global node id"""
+    if model in _contribution_cache:
+        return _contribution_cache[model]
+
+    n_trees = len(model.estimators_)
+    tables, node_to_row, offsets = [], [], []
+    node_offset = row_offset = 0
+    bias = 0.0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        leaves = np.where(tree.children_left < 0)[0]
+        tables.append(_tree_leaf_contributions(tree, model.n_features_in_)[leaves] / n_trees)
+        rows = np.full(tree.node_count, -1, dtype=np.int64)
+        rows[leaves] = np.arange(len(leaves)) + row_offset
+        node_to_row.append(rows)
+        offsets.append(node_offset)
+        bias += tree.value[0, 0, 0]
+        node_offset += tree.node_count
+        row_offset += len(leaves)
+
+    entry = {
+        'table': np.vstack(tables),
+        'node_to_row': np.concatenate(node_to_row),
+        'offsets': np.array(offsets),
+        'bias': bias / n_trees
+    }
+    _contribution_cache[model] = entry
+    return entry
+
+def forest_leaves(model, X):
+    """Leaf index reached in every tree, shape (n_rows, n_trees).
+
+    Calls each tree's low-level apply directly, which skips the per-call
+    joblib dispatch of model.apply() and releases the GIL.
+    """
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    return np.column_stack([estimator.tree_.apply(X) for estimator in model.estimators_])
+
+def forest_contributions(model, X, chunk_size=2000):
+    """Per-feature contributions for each row of X.
+
+    Returns (baseline, contributions) where contributions has shape
+    (n_rows, n_features) and baseline + contributions.sum(axis=1) equals
+    model.predict(X). Leaf contributions are precomputed once per model, so
+    each row only costs one leaf lookup per tree.
+    """
+    entry = _contribution_table(model)
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    contributions = np.empty((len(X), model.n_features_in_))
+    for start in range(0, len(X), chunk_size):
+        leaves = forest_leaves(model, X[start:start + chunk_size])
+        rows = entry['node_to_row'][leaves + entry['offsets']]
+        contributions[start:start + chunk_size] = entry['table'][rows].sum(axis=1)
+    return entry['bias'], contributions
+
+def top_drivers(contributions, n=5):
+    """Return the n (feature, contribution) pairs with the largest absolute effect"""
+    return sorted(contributions.items(), key=lambda item: abs(item[1]), reverse=True)[:n]
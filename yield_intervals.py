@@ -0,0 +1,46 @@
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from yield_explanations import forest_leaves
+
+# Flattened leaf values, one per fitted forest, dropped when the model goes away
+_leaf_value_cache = weakref.WeakKeyDictionary()
+
+def _leaf_values(model):
+    """All node values of all trees in one array, plus each tree's offset"""
+    if model not in _leaf_value_cache:
+        values = [estimator.tree_.value[:, 0, 0] for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [len(v) for v in values[:-1]])
+        _leaf_value_cache[model] = (np.concatenate(values), offsets)
+    return _leaf_value_cache[model]
+
+def tree_predictions(model, X, n_jobs=None, chunk_size=5000):
+    """Prediction of every tree for every row, shape (n_rows, n_trees).
+
+    Rows are split into chunks that run on a thread pool; tree traversal
+    releases the GIL, so chunks use separate cores.
+    """
+    values, offsets = _leaf_values(model)
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+
+    def predict_chunk(start):
+        return values[forest_leaves(model, X[start:start + chunk_size]) + offsets]
+
+    starts = range(0, len(X), chunk_size)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(starts) == 1:
+        return np.vstack([predict_chunk(start) for start in starts])
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        return np.vstack(list(executor.map(predict_chunk, starts)))
+
+def prediction_intervals(model, X, coverage=0.9, n_jobs=None):
+    """Point estimate and interval for each row from the spread across trees.
+
+    Returns (mean, low, high); the mean of the trees is the forest's own
+    prediction, so no separate predict call is needed.
+    """
+    per_tree = tree_predictions(model, X, n_jobs=n_jobs)
+    tail = (1 - coverage) / 2 * 100
+    low, high = np.percentile(per_tree, [tail, 100 - tail], axis=1)
+    return per_tree.mean(axis=1), low, high